@@ -0,0 +1,38 @@
+"""
+Cache lookup overhead: st.cache_data keyed on a full DataFrame argument versus the
+dataset-keyed cache in src/utils/cache.py. Run from the repository root:
+    
+    python benchmarks/bench_cache_lookup.py
+"""
+
+import os
+import sys
+import timeit
+import logging
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+import streamlit as st
+from src.data_processing.loader import load_emissions_data
+from src.data_processing.aggregator import aggregate_by_year
+
+@st.cache_data
+def aggregate_by_year_frame_keyed(df, column='Total'):
+    return df.groupby('Year')[column].sum().reset_index()
+
+def main(repeat=200):
+    df = load_emissions_data()
+    
+    aggregate_by_year_frame_keyed(df, 'Total')
+    aggregate_by_year('emissions', 'Total')
+    
+    before = timeit.timeit(lambda: aggregate_by_year_frame_keyed(df, 'Total'), number=repeat) / repeat
+    after = timeit.timeit(lambda: aggregate_by_year('emissions', 'Total'), number=repeat) / repeat
+    
+    print(f"st.cache_data (DataFrame argument): {before * 1e6:10.1f} us per cache hit")
+    print(f"dataset-keyed cache:                {after * 1e6:10.1f} us per cache hit")
+    print(f"speedup:                            {before / after:10.1f}x")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Figure construction: Plotly Express builders versus the NumPy dict builders in
+src/visualizations/fast_figures.py. For each chart type, reports build time, the
+serialized payload size and whether both backends produce the same figure JSON.
+Run from the repository root:
+    
+    python benchmarks/bench_figure_builders.py
+"""
+
+import os
+import sys
+import json
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.data_processing.aggregator import aggregate_by_year_range, get_countries_data, get_top_emitters, range_total_by_source
+from src.visualizations.time_series import create_line_chart, create_area_chart, create_stacked_area_chart
+from src.visualizations.comparison_charts import create_bar_comparison, create_horizontal_bar_comparison
+from src.visualizations.source_breakdown import create_pie_chart
+
+SOURCE_COLUMNS = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
+
+def get_cases():
+    by_year = aggregate_by_year_range('emissions', ['Total'] + SOURCE_COLUMNS, 1750, 2021)
+    countries = get_countries_data('emissions', ['China', 'USA', 'India', 'Russia', 'Japan'])
+    top = get_top_emitters('emissions', 'Total', 2021, config.TOP_N_COUNTRIES)
+    sources = range_total_by_source('emissions', 2021, 2021)
+    
+    return {
+        'line': lambda: create_line_chart(by_year, 'Year', 'Total', "Total"),
+        'line (5 countries)': lambda: create_line_chart(countries, 'Year', 'Total', "Total", color_col='Country'),
+        'area (5 countries)': lambda: create_area_chart(countries, 'Year', 'Total', "Total", color_col='Country'),
+        'stacked area': lambda: create_stacked_area_chart(by_year, 'Year', SOURCE_COLUMNS, "Sources"),
+        'bar': lambda: create_bar_comparison(top, 'Country', 'Total', "Top"),
+        'horizontal bar': lambda: create_horizontal_bar_comparison(top, 'Country', 'Total', "Top"),
+        'pie': lambda: create_pie_chart(sources['Source'].tolist(), sources['Emissions'].to_numpy(), "Sources")
+    }
+
+def run(build, backend, repeat):
+    config.FIGURE_BACKEND = backend
+    fig = build()
+    seconds = timeit.timeit(build, number=repeat) / repeat
+    return seconds, fig.to_json()
+
+def main(repeat=20):
+    print(f"{'chart':<20} {'express ms':>10} {'fast ms':>8} {'speedup':>8} {'express KB':>10} {'fast KB':>8}  same")
+    
+    for name, build in get_cases().items():
+        express_time, express_json = run(build, 'express', repeat)
+        fast_time, fast_json = run(build, 'fast', repeat)
+        same = json.loads(express_json) == json.loads(fast_json)
+        
+        print(
+            f"{name:<20} {express_time * 1e3:10.2f} {fast_time * 1e3:8.2f} {express_time / fast_time:7.1f}x "
+            f"{len(express_json) / 1e3:10.1f} {len(fast_json) / 1e3:8.1f}  {same}"
+        )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,18 @@
+import streamlit as st
+from src.data_processing import loader
+
+def _load(name):
+    df = loader.get_dataset_store().view(name)
+    error = loader.get_dataset_error(name)
+    if error is not None:
+        st.error(f"Error loading {name.replace('_', ' ')} data: {error}")
+    return df
+
+def load_emissions_data():
+    return _load('emissions')
+
+def load_per_capita_data():
+    return _load('per_capita')
+
+def load_sources_data():
+    return _load('sources')
\ No newline at end of file
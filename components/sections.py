@@ -0,0 +1,16 @@
+import streamlit as st
+
+def _fragment_decorator():
+    # st.fragment from Streamlit 1.37, st.experimental_fragment before that; on older versions
+    # a section is a plain function and reruns with the rest of the page.
+    for name in ('fragment', 'experimental_fragment'):
+        if hasattr(st, name):
+            return getattr(st, name)
+    return lambda func: func
+
+_fragment = _fragment_decorator()
+
+def section(func):
+    # A section's dependencies are its arguments: pass in the sidebar values it reads. Widgets
+    # created inside the section only rerun that section; sidebar changes rerun the whole page.
+    return _fragment(func)
\ No newline at end of file
@@ -12,8 +12,70 @@ SOURCES_FILE = f"{DATA_DIR}/GCB2022v27_sources_flat.csv"
 TOTAL_EMISSIONS_METADATA = f"{DATA_DIR}/GCB2022v27_MtCO2_flat_metadata.json"
 PER_CAPITA_METADATA = f"{DATA_DIR}/GCB2022v27_percapita_flat_metadata.json"
 
+# Natural Earth 1:110m countries as TopoJSON at several levels of detail (scripts/build_world_geometry.py).
+WORLD_GEOMETRY_FILE = f"{DATA_DIR}/geometry/world_110m.topo.json"
+
+DATA_CACHE_ENABLED = True
+DATA_CACHE_EXTENSION = ".arrow"
+# Parse CSVs with pyarrow's multithreaded reader when it is installed.
+DATA_CSV_ARROW_READER = True
+# Start loading every dataset in parallel as soon as the dataset store is created.
+DATASET_PRELOAD = True
+# Seconds allowed for each page's default render during start-up warm-up (scripts/run_dashboard.py).
+WARM_UP_PAGE_TIMEOUT = 120
+
+CACHE_MAX_ENTRIES = 128
+CACHE_TTL_SECONDS = None
+
+FIGURE_CACHE_ENABLED = True
+FIGURE_CACHE_MAX_ENTRIES = 256
+# "fast" builds supported charts as dicts from NumPy arrays; "express" always uses Plotly Express.
+FIGURE_BACKEND = "fast"
+# Figures are rounded to this many significant digits and trimmed before they are sent (payload.py).
+FIGURE_MINIMIZE_PAYLOAD = True
+FIGURE_SIGNIFICANT_DIGITS = 6
+
+# Local query API (python -m src.api.server).
+API_HOST = "127.0.0.1"
+API_PORT = 8502
+API_RESPONSE_CACHE_ENTRIES = 256
+# Smaller bodies are sent uncompressed.
+API_GZIP_MIN_BYTES = 1024
+API_GZIP_LEVEL = 6
+
+INTEGER_COLUMNS = {"Year": "int16"}
+# Numeric columns with at least this share of missing values are stored sparse (values plus positions).
+SPARSE_MIN_MISSING_FRACTION = 0.5
+
 DEFAULT_CHART_HEIGHT = 500
 DEFAULT_MAP_HEIGHT = 600
+# Approximate rendered width of a full-width chart in the wide layout; half-width columns use half.
+CHART_WIDTH_PX = 1200
+# LTTB keeps at most this many points per trace per pixel of chart width.
+LTTB_POINTS_PER_PIXEL = 0.2
+# Scatter and bubble charts with more points than this render as WebGL (Scattergl) instead of SVG.
+SCATTER_WEBGL_THRESHOLD = 1000
+# Heatmaps with more cells than this are drawn without per-cell value labels.
+HEATMAP_MAX_LABELED_CELLS = 5000
+
+# "bundled" fills countries from WORLD_GEOMETRY_FILE with Plotly's geo base layers switched off;
+# "plotly" keeps Plotly's base map.
+MAP_GEOMETRY = "bundled"
+# Level of detail of the bundled geometry by map scope; continent scopes use 'region'.
+MAP_GEOMETRY_LEVELS = {'world': 'medium', 'region': 'high'}
+MAP_ANIMATION_GEOMETRY_LEVEL = 'low'
+# Coordinate decimals per level; rounding to one moves a point less than 'low' and 'medium' are simplified by.
+MAP_GEOMETRY_DECIMALS = {'low': 1, 'medium': 1, 'high': 2}
+MAP_SHOW_LAKES = False
+MAP_SHOW_RIVERS = False
+
+# Delta-frame choropleth animation: coarse year step first, finer steps on request.
+CHOROPLETH_ANIMATION_STEP = 10
+CHOROPLETH_STEP_OPTIONS = [1, 2, 5, 10, 25]
+CHOROPLETH_CHUNK_SIZE = 16
+CHOROPLETH_KEYFRAME_INTERVAL = 10
+# Decimals shown in the animated map's hover; a country is resent whenever its value changes at this precision.
+CHOROPLETH_HOVER_DECIMALS = 1
 
 EMISSION_SOURCES_COLORS = {
     "Coal": "#E57373",
@@ -39,4 +101,12 @@ REGIONS = {
     "Africa": ["ZAF", "NGA", "EGY", "DZA", "MAR"],
     "South America": ["BRA", "ARG", "COL", "CHL", "PER"],
     "Oceania": ["AUS", "NZL"]
-}
\ No newline at end of file
+}
+
+# Rows that are sums of other rows; rollups exclude them to avoid double counting.
+AGGREGATE_ISO_CODES = ["WLD"]
+INTERNATIONAL_TRANSPORT_ISO = "XIT"
+# Rows that are not countries; rankings and maps leave them out.
+NON_COUNTRY_ISO_CODES = AGGREGATE_ISO_CODES + [INTERNATIONAL_TRANSPORT_ISO]
+ROLLUP_OTHER_LABEL = "Rest of World"
+ROLLUP_TRANSPORT_LABEL = "International Transport"
\ No newline at end of file
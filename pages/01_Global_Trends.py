@@ -8,102 +8,123 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import config
-from src.data_processing.loader import load_emissions_data
+from src.data_processing.aggregator import aggregate_by_year_range, get_year_matrix
+from src.visualizations.figure_cache import get_figure
+from src.visualizations import theme
+from src.visualizations.time_series import create_line_chart, create_stacked_area_chart
+from src.visualizations.geo_visualizations import animate_choropleth_delta
+from components.data import load_emissions_data
 from components.sidebar import add_year_range_selector
 from components.filters import add_source_filter
+from components.sections import section
 
 st.set_page_config(page_title=f"Global Trends - {config.APP_TITLE}", page_icon=config.APP_ICON, layout="wide")
 
-def main():
-    st.title("Global CO2 Emission Trends")
-    st.write("Analyze global emissions trends over time and by source.")
-    
-    df = load_emissions_data()
-    
-    st.sidebar.header("Filters")
-    start_year, end_year = add_year_range_selector(df)
-    selected_sources = add_source_filter(["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"])
-    
-    filtered_df = df[(df['Year'] >= start_year) & (df['Year'] <= end_year)]
-    
+@section
+def global_trend_section(start_year, end_year):
     st.header("Global Emissions Over Time")
     
-    global_by_year = filtered_df.groupby('Year').agg({'Total': 'sum'}).reset_index()
+    global_by_year = aggregate_by_year_range('emissions', 'Total', start_year, end_year)
     
-    fig1 = px.line(
-        global_by_year, 
-        x='Year', 
-        y='Total',
-        title="Total Global CO2 Emissions (Million Tonnes)",
-        height=config.DEFAULT_CHART_HEIGHT,
+    fig1 = create_line_chart(
+        global_by_year,
+        'Year',
+        'Total',
+        "Total Global CO2 Emissions (Million Tonnes)",
         labels={"Total": "Million Tonnes CO2", "Year": "Year"},
-        template="plotly_white"
-    )
-    
-    fig1.update_layout(
-        xaxis=dict(tickmode='linear', dtick=5),
-        hovermode="x unified"
+        data_key=('emissions', start_year, end_year)
     )
     
     st.plotly_chart(fig1, use_container_width=True)
-    
+
+@section
+def source_trend_section(start_year, end_year, source_columns):
     st.header("Emissions by Source Over Time")
     
-    source_columns = [s for s in selected_sources if s in filtered_df.columns]
     if source_columns:
-        global_by_source = filtered_df.groupby('Year')[source_columns].sum().reset_index()
-        global_by_source_melted = pd.melt(
-            global_by_source, 
-            id_vars=['Year'], 
-            value_vars=source_columns,
-            var_name='Source', 
-            value_name='Emissions'
+        global_by_source = aggregate_by_year_range('emissions', source_columns, start_year, end_year)
+        
+        fig2 = create_stacked_area_chart(
+            global_by_source,
+            'Year',
+            source_columns,
+            "Global CO2 Emissions by Source (Million Tonnes)",
+            labels={"Value": "Million Tonnes CO2", "Category": "Source", "Year": "Year"},
+            data_key=('emissions', start_year, end_year)
         )
         
-        fig2 = px.area(
-            global_by_source_melted, 
-            x='Year', 
-            y='Emissions',
-            color='Source',
-            title="Global CO2 Emissions by Source (Million Tonnes)",
+        st.plotly_chart(fig2, use_container_width=True)
+
+@section
+def annual_change_section(start_year, end_year):
+    st.header("Annual Change in Global Emissions")
+    
+    def build_change_chart():
+        global_by_year = aggregate_by_year_range('emissions', 'Total', start_year, end_year)
+        global_by_year['YoY_Change'] = global_by_year['Total'].pct_change() * 100
+        
+        yoy_df = global_by_year.dropna(subset=['YoY_Change'])
+        
+        fig = px.bar(
+            yoy_df,
+            x='Year',
+            y='YoY_Change',
+            title="Year-over-Year Change in Global CO2 Emissions (%)",
             height=config.DEFAULT_CHART_HEIGHT,
-            labels={"Emissions": "Million Tonnes CO2", "Year": "Year"},
-            color_discrete_map=config.EMISSION_SOURCES_COLORS,
-            template="plotly_white"
+            labels={"YoY_Change": "% Change", "Year": "Year"},
+            template=theme.CHART_TEMPLATE,
+            color='YoY_Change',
+            color_continuous_scale=['red', 'white', 'green'],
+            range_color=[-max(abs(yoy_df['YoY_Change'])), max(abs(yoy_df['YoY_Change']))]
         )
         
-        fig2.update_layout(
+        fig.update_layout(
             xaxis=dict(tickmode='linear', dtick=5),
             hovermode="x unified"
         )
         
-        st.plotly_chart(fig2, use_container_width=True)
-    
-    st.header("Annual Change in Global Emissions")
+        return fig
     
-    global_by_year['YoY_Change'] = global_by_year['Total'].pct_change() * 100
-    
-    yoy_df = global_by_year.dropna(subset=['YoY_Change'])
-    
-    fig3 = px.bar(
-        yoy_df,
-        x='Year',
-        y='YoY_Change',
-        title="Year-over-Year Change in Global CO2 Emissions (%)",
-        height=config.DEFAULT_CHART_HEIGHT,
-        labels={"YoY_Change": "% Change", "Year": "Year"},
-        template="plotly_white",
-        color='YoY_Change',
-        color_continuous_scale=['red', 'white', 'green'],
-        range_color=[-max(abs(yoy_df['YoY_Change'])), max(abs(yoy_df['YoY_Change']))]
+    fig3 = get_figure('global_trends.change', ('emissions', start_year, end_year), (), build_change_chart)
+    st.plotly_chart(fig3, use_container_width=True)
+
+@section
+def emissions_map_section(start_year, end_year):
+    st.header("Emissions Map Over Time")
+    
+    year_step = st.select_slider(
+        "Years per animation frame",
+        options=config.CHOROPLETH_STEP_OPTIONS,
+        value=config.CHOROPLETH_ANIMATION_STEP,
+        help="The map starts with a coarse step; choose a finer step or narrow the year range to load more frames."
     )
     
-    fig3.update_layout(
-        xaxis=dict(tickmode='linear', dtick=5),
-        hovermode="x unified"
+    emissions_matrix = get_year_matrix('emissions', 'Total', start_year, end_year)
+    
+    fig4 = animate_choropleth_delta(
+        emissions_matrix,
+        "CO2 Emissions by Country (Million Tonnes)",
+        year_step=year_step,
+        value_label="Million Tonnes CO2",
+        data_key=('emissions', start_year, end_year)
     )
     
-    st.plotly_chart(fig3, use_container_width=True)
+    st.plotly_chart(fig4, use_container_width=True)
+
+def main():
+    st.title("Global CO2 Emission Trends")
+    st.write("Analyze global emissions trends over time and by source.")
+    
+    df = load_emissions_data()
+    
+    st.sidebar.header("Filters")
+    start_year, end_year = add_year_range_selector(df)
+    selected_sources = add_source_filter(["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"])
+    
+    global_trend_section(start_year, end_year)
+    source_trend_section(start_year, end_year, [s for s in selected_sources if s in df.columns])
+    annual_change_section(start_year, end_year)
+    emissions_map_section(start_year, end_year)
     
     st.markdown("### About the Data")
     st.write(
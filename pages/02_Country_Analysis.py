@@ -8,152 +8,176 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import config
-from src.data_processing.loader import load_emissions_data, load_per_capita_data
+from src.data_processing.aggregator import get_country_data, get_top_emitters
+from src.visualizations.figure_cache import get_figure
+from src.visualizations import theme
+from src.visualizations.comparison_charts import create_horizontal_bar_comparison
+from src.visualizations.time_series import downsample_frame
+from components.data import load_emissions_data
 from components.sidebar import add_year_selector, add_country_selector
 from components.filters import add_source_filter
+from components.sections import section
 
 st.set_page_config(page_title=f"Country Analysis - {config.APP_TITLE}", page_icon=config.APP_ICON, layout="wide")
 
-def main():
-    st.title("Country CO2 Emissions Analysis")
-    st.write("Analyze CO2 emissions by country, comparing total and per capita metrics.")
-    
-    emissions_df = load_emissions_data()
-    per_capita_df = load_per_capita_data()
-    
-    st.sidebar.header("Filters")
-    selected_year = add_year_selector(emissions_df, default=config.DEFAULT_END_YEAR)
-    selected_country = add_country_selector(emissions_df)
-    selected_sources = add_source_filter(["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"])
-    
-    year_df = emissions_df[emissions_df['Year'] == selected_year]
-    year_per_capita_df = per_capita_df[per_capita_df['Year'] == selected_year]
-    
+@section
+def emitters_section(selected_year):
     st.header(f"Top and Bottom Emitters in {selected_year}")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        top_emitters = year_df.sort_values('Total', ascending=False).head(config.TOP_N_COUNTRIES)
+        top_emitters = get_top_emitters('emissions', 'Total', selected_year, config.TOP_N_COUNTRIES)
         
-        fig1 = px.bar(
+        fig1 = create_horizontal_bar_comparison(
             top_emitters,
-            y='Country',
-            x='Total',
-            title=f"Top {config.TOP_N_COUNTRIES} CO2 Emitters (Million Tonnes)",
-            height=config.DEFAULT_CHART_HEIGHT,
-            orientation='h',
+            'Country',
+            'Total',
+            f"Top {config.TOP_N_COUNTRIES} CO2 Emitters (Million Tonnes)",
             labels={"Total": "Million Tonnes CO2", "Country": ""},
-            color='Total',
-            color_continuous_scale=config.CHOROPLETH_COLORSCALE,
-            template="plotly_white"
+            text_auto=False,
+            data_key=('emissions', selected_year)
         )
         
-        fig1.update_layout(yaxis={'categoryorder': 'total ascending'})
         st.plotly_chart(fig1, use_container_width=True)
         
     with col2:
-        top_per_capita = year_per_capita_df.sort_values('Total', ascending=False).head(config.TOP_N_COUNTRIES)
+        top_per_capita = get_top_emitters('per_capita', 'Total', selected_year, config.TOP_N_COUNTRIES)
         
-        fig2 = px.bar(
+        fig2 = create_horizontal_bar_comparison(
             top_per_capita,
-            y='Country',
-            x='Total',
-            title=f"Top {config.TOP_N_COUNTRIES} Per Capita CO2 Emitters (Tonnes per Capita)",
-            height=config.DEFAULT_CHART_HEIGHT,
-            orientation='h',
+            'Country',
+            'Total',
+            f"Top {config.TOP_N_COUNTRIES} Per Capita CO2 Emitters (Tonnes per Capita)",
             labels={"Total": "Tonnes CO2 per Capita", "Country": ""},
-            color='Total',
-            color_continuous_scale=config.CHOROPLETH_COLORSCALE,
-            template="plotly_white"
+            text_auto=False,
+            data_key=('per_capita', selected_year)
         )
         
-        fig2.update_layout(yaxis={'categoryorder': 'total ascending'})
         st.plotly_chart(fig2, use_container_width=True)
-    
+
+@section
+def country_history_section(selected_country):
     st.header(f"Detailed Analysis for {selected_country}")
     
-    country_data = emissions_df[emissions_df['Country'] == selected_country]
-    country_per_capita = per_capita_df[per_capita_df['Country'] == selected_country]
+    country_data = get_country_data('emissions', selected_country)
+    country_per_capita = get_country_data('per_capita', selected_country)
     
     col3, col4 = st.columns(2)
     
     with col3:
-        fig3 = px.line(
-            country_data,
-            x='Year',
-            y='Total',
-            title=f"Historical CO2 Emissions for {selected_country}",
-            height=config.DEFAULT_CHART_HEIGHT,
-            labels={"Total": "Million Tonnes CO2", "Year": "Year"},
-            template="plotly_white"
-        )
+        def build_history_chart():
+            fig = px.line(
+                downsample_frame(country_data, 'Year', 'Total', width_px=config.CHART_WIDTH_PX // 2),
+                x='Year',
+                y='Total',
+                title=f"Historical CO2 Emissions for {selected_country}",
+                height=config.DEFAULT_CHART_HEIGHT,
+                labels={"Total": "Million Tonnes CO2", "Year": "Year"},
+                template=theme.CHART_TEMPLATE
+            )
+            
+            fig.update_layout(hovermode="x unified")
+            
+            return fig
         
-        fig3.update_layout(hovermode="x unified")
+        fig3 = get_figure('country_analysis.history', ('emissions', selected_country), (), build_history_chart)
         st.plotly_chart(fig3, use_container_width=True)
         
     with col4:
-        fig4 = px.line(
-            country_per_capita,
-            x='Year',
-            y='Total',
-            title=f"Per Capita CO2 Emissions for {selected_country}",
-            height=config.DEFAULT_CHART_HEIGHT,
-            labels={"Total": "Tonnes CO2 per Capita", "Year": "Year"},
-            template="plotly_white"
-        )
+        def build_per_capita_history_chart():
+            fig = px.line(
+                downsample_frame(country_per_capita, 'Year', 'Total', width_px=config.CHART_WIDTH_PX // 2),
+                x='Year',
+                y='Total',
+                title=f"Per Capita CO2 Emissions for {selected_country}",
+                height=config.DEFAULT_CHART_HEIGHT,
+                labels={"Total": "Tonnes CO2 per Capita", "Year": "Year"},
+                template=theme.CHART_TEMPLATE
+            )
+            
+            fig.update_layout(hovermode="x unified")
+            
+            return fig
         
-        fig4.update_layout(hovermode="x unified")
+        fig4 = get_figure('country_analysis.per_capita_history', ('per_capita', selected_country), (), build_per_capita_history_chart)
         st.plotly_chart(fig4, use_container_width=True)
-    
+
+@section
+def country_sources_section(selected_country, selected_year, source_columns):
     st.header(f"Emissions Sources for {selected_country} in {selected_year}")
     
+    country_data = get_country_data('emissions', selected_country)
     country_year_data = country_data[country_data['Year'] == selected_year]
     
     if not country_year_data.empty:
-        source_columns = [s for s in selected_sources if s in country_data.columns]
         source_values = country_year_data[source_columns].iloc[0].tolist()
         
-        fig5 = px.pie(
-            names=source_columns,
-            values=source_values,
-            title=f"CO2 Emissions by Source for {selected_country} ({selected_year})",
-            height=config.DEFAULT_CHART_HEIGHT,
-            color=source_columns,
-            color_discrete_map=config.EMISSION_SOURCES_COLORS,
-            template="plotly_white"
-        )
+        def build_source_pie():
+            fig = px.pie(
+                names=source_columns,
+                values=source_values,
+                title=f"CO2 Emissions by Source for {selected_country} ({selected_year})",
+                height=config.DEFAULT_CHART_HEIGHT,
+                color=source_columns,
+                color_discrete_map=config.EMISSION_SOURCES_COLORS,
+                template=theme.CHART_TEMPLATE
+            )
+            
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            
+            return fig
         
-        fig5.update_traces(textposition='inside', textinfo='percent+label')
+        fig5 = get_figure('country_analysis.source_pie', ('emissions', selected_country, selected_year), source_columns, build_source_pie)
         st.plotly_chart(fig5, use_container_width=True)
         
         st.header(f"Source Trends for {selected_country}")
         
-        country_sources = country_data[['Year'] + source_columns].copy()
-        country_sources_melted = pd.melt(
-            country_sources, 
-            id_vars=['Year'], 
-            value_vars=source_columns,
-            var_name='Source', 
-            value_name='Emissions'
-        )
-        
-        fig6 = px.area(
-            country_sources_melted,
-            x='Year',
-            y='Emissions',
-            color='Source',
-            title=f"CO2 Emissions by Source Over Time for {selected_country}",
-            height=config.DEFAULT_CHART_HEIGHT,
-            labels={"Emissions": "Million Tonnes CO2", "Year": "Year"},
-            color_discrete_map=config.EMISSION_SOURCES_COLORS,
-            template="plotly_white"
-        )
+        def build_source_trend_chart():
+            country_sources = country_data[['Year'] + source_columns].copy()
+            country_sources_melted = pd.melt(
+                country_sources, 
+                id_vars=['Year'], 
+                value_vars=source_columns,
+                var_name='Source', 
+                value_name='Emissions'
+            )
+            
+            fig = px.area(
+                country_sources_melted,
+                x='Year',
+                y='Emissions',
+                color='Source',
+                title=f"CO2 Emissions by Source Over Time for {selected_country}",
+                height=config.DEFAULT_CHART_HEIGHT,
+                labels={"Emissions": "Million Tonnes CO2", "Year": "Year"},
+                color_discrete_map=config.EMISSION_SOURCES_COLORS,
+                template=theme.CHART_TEMPLATE
+            )
+            
+            fig.update_layout(hovermode="x unified")
+            
+            return fig
         
-        fig6.update_layout(hovermode="x unified")
+        fig6 = get_figure('country_analysis.source_trends', ('emissions', selected_country), source_columns, build_source_trend_chart)
         st.plotly_chart(fig6, use_container_width=True)
     else:
         st.write(f"No data available for {selected_country} in {selected_year}")
 
+def main():
+    st.title("Country CO2 Emissions Analysis")
+    st.write("Analyze CO2 emissions by country, comparing total and per capita metrics.")
+    
+    emissions_df = load_emissions_data()
+    
+    st.sidebar.header("Filters")
+    selected_year = add_year_selector(emissions_df, default=config.DEFAULT_END_YEAR)
+    selected_country = add_country_selector(emissions_df)
+    selected_sources = add_source_filter(["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"])
+    
+    emitters_section(selected_year)
+    country_history_section(selected_country)
+    country_sources_section(selected_country, selected_year, [s for s in selected_sources if s in emissions_df.columns])
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
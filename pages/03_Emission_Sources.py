@@ -8,48 +8,49 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import config
-from src.data_processing.loader import load_emissions_data
+from src.data_processing.aggregator import (
+    aggregate_by_year_range, range_total_by_source, aggregate_by_region_and_source, get_top_by_metric
+)
+from src.visualizations.figure_cache import get_figure
+from src.visualizations import theme
+from src.visualizations.time_series import create_line_chart
+from src.visualizations.comparison_charts import create_horizontal_bar_comparison
+from components.data import load_emissions_data
 from components.sidebar import add_year_range_selector, add_year_selector
 from components.filters import add_region_filter
+from components.sections import section
 
 st.set_page_config(page_title=f"Emission Sources - {config.APP_TITLE}", page_icon=config.APP_ICON, layout="wide")
 
-def main():
-    st.title("CO2 Emission Sources Analysis")
-    st.write("Analyze the contribution of different emission sources and how they've changed over time.")
-    
-    df = load_emissions_data()
-    
-    st.sidebar.header("Filters")
-    start_year, end_year = add_year_range_selector(df)
-    selected_year = add_year_selector(df, default=config.DEFAULT_END_YEAR, label="Focus Year")
-    selected_regions = add_region_filter()
-    
-    filtered_df = df[(df['Year'] >= start_year) & (df['Year'] <= end_year)]
-    
-    year_df = df[df['Year'] == selected_year]
-    
+@section
+def source_pie_section(selected_year):
     st.header(f"Global Emission Sources in {selected_year}")
     
-    source_columns = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
-    global_sources = year_df[source_columns].sum()
-    
-    fig1 = px.pie(
-        names=global_sources.index,
-        values=global_sources.values,
-        title=f"Global CO2 Emissions by Source ({selected_year})",
-        height=config.DEFAULT_CHART_HEIGHT,
-        color=global_sources.index,
-        color_discrete_map=config.EMISSION_SOURCES_COLORS,
-        template="plotly_white"
-    )
+    def build_source_pie():
+        global_sources = range_total_by_source('emissions', selected_year, selected_year)
+        
+        fig = px.pie(
+            names=global_sources['Source'],
+            values=global_sources['Emissions'],
+            title=f"Global CO2 Emissions by Source ({selected_year})",
+            height=config.DEFAULT_CHART_HEIGHT,
+            color=global_sources['Source'],
+            color_discrete_map=config.EMISSION_SOURCES_COLORS,
+            template=theme.CHART_TEMPLATE
+        )
+        
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        
+        return fig
     
-    fig1.update_traces(textposition='inside', textinfo='percent+label')
+    fig1 = get_figure('emission_sources.pie', ('emissions', selected_year), (), build_source_pie)
     st.plotly_chart(fig1, use_container_width=True)
-    
+
+@section
+def source_evolution_section(start_year, end_year, source_columns):
     st.header("Evolution of Emission Sources")
     
-    source_by_year = filtered_df.groupby('Year')[source_columns].sum().reset_index()
+    source_by_year = aggregate_by_year_range('emissions', source_columns, start_year, end_year)
     
     for source in source_columns:
         source_by_year[f"{source}_pct"] = (source_by_year[source] / source_by_year[source_columns].sum(axis=1)) * 100
@@ -65,24 +66,28 @@ def main():
     
     source_pct_melted['Source'] = source_pct_melted['Source'].str.replace('_pct', '')
     
-    fig2 = px.area(
-        source_pct_melted,
-        x='Year',
-        y='Percentage',
-        color='Source',
-        title="Relative Contribution of Emission Sources Over Time (%)",
-        height=config.DEFAULT_CHART_HEIGHT,
-        labels={"Percentage": "Contribution (%)", "Year": "Year"},
-        color_discrete_map=config.EMISSION_SOURCES_COLORS,
-        template="plotly_white"
-    )
-    
-    fig2.update_layout(
-        xaxis=dict(tickmode='linear', dtick=5),
-        hovermode="x unified",
-        yaxis=dict(range=[0, 100])
-    )
+    def build_share_chart():
+        fig = px.area(
+            source_pct_melted,
+            x='Year',
+            y='Percentage',
+            color='Source',
+            title="Relative Contribution of Emission Sources Over Time (%)",
+            height=config.DEFAULT_CHART_HEIGHT,
+            labels={"Percentage": "Contribution (%)", "Year": "Year"},
+            color_discrete_map=config.EMISSION_SOURCES_COLORS,
+            template=theme.CHART_TEMPLATE
+        )
+        
+        fig.update_layout(
+            xaxis=dict(tickmode='linear', dtick=5),
+            hovermode="x unified",
+            yaxis=dict(range=[0, 100])
+        )
+        
+        return fig
     
+    fig2 = get_figure('emission_sources.shares', ('emissions', start_year, end_year), (), build_share_chart)
     st.plotly_chart(fig2, use_container_width=True)
     
     st.header("Absolute Emissions by Source")
@@ -95,53 +100,36 @@ def main():
         value_name='Emissions'
     )
     
-    fig3 = px.line(
+    fig3 = create_line_chart(
         source_melted,
-        x='Year',
-        y='Emissions',
-        color='Source',
-        title="Global CO2 Emissions by Source Over Time",
-        height=config.DEFAULT_CHART_HEIGHT,
+        'Year',
+        'Emissions',
+        "Global CO2 Emissions by Source Over Time",
+        color_col='Source',
         labels={"Emissions": "Million Tonnes CO2", "Year": "Year"},
         color_discrete_map=config.EMISSION_SOURCES_COLORS,
-        template="plotly_white"
-    )
-    
-    fig3.update_layout(
-        xaxis=dict(tickmode='linear', dtick=5),
-        hovermode="x unified"
+        data_key=('emissions', start_year, end_year)
     )
     
     st.plotly_chart(fig3, use_container_width=True)
-    
-    if selected_regions:
-        st.header(f"Source Analysis by Region ({selected_year})")
-        
-        region_countries = []
-        for region in selected_regions:
-            if region in config.REGIONS:
-                region_countries.extend(config.REGIONS[region])
-        
-        region_df = year_df[year_df['ISO 3166-1 alpha-3'].isin(region_countries)]
+
+@section
+def region_section(selected_year, selected_regions, source_columns):
+    st.header(f"Source Analysis by Region ({selected_year})")
+    
+    region_sources = aggregate_by_region_and_source('emissions', selected_year, sorted(selected_regions))
+    
+    if not region_sources.empty:
+        region_sources_melted = pd.melt(
+            region_sources, 
+            id_vars=['Region'], 
+            value_vars=source_columns,
+            var_name='Source', 
+            value_name='Emissions'
+        )
         
-        if not region_df.empty:
-            region_map = {}
-            for region in selected_regions:
-                for country_code in config.REGIONS[region]:
-                    region_map[country_code] = region
-            
-            region_df['Region'] = region_df['ISO 3166-1 alpha-3'].map(region_map)
-            region_sources = region_df.groupby('Region')[source_columns].sum().reset_index()
-            
-            region_sources_melted = pd.melt(
-                region_sources, 
-                id_vars=['Region'], 
-                value_vars=source_columns,
-                var_name='Source', 
-                value_name='Emissions'
-            )
-            
-            fig4 = px.bar(
+        def build_region_chart():
+            fig = px.bar(
                 region_sources_melted,
                 x='Region',
                 y='Emissions',
@@ -150,24 +138,25 @@ def main():
                 height=config.DEFAULT_CHART_HEIGHT,
                 labels={"Emissions": "Million Tonnes CO2", "Region": ""},
                 color_discrete_map=config.EMISSION_SOURCES_COLORS,
-                template="plotly_white",
+                template=theme.CHART_TEMPLATE,
                 barmode='group'
             )
             
-            st.plotly_chart(fig4, use_container_width=True)
-        else:
-            st.write("No data available for selected regions in the chosen year.")
-    
+            return fig
+        
+        fig4 = get_figure('emission_sources.regions', ('emissions', selected_year), sorted(selected_regions), build_region_chart)
+        st.plotly_chart(fig4, use_container_width=True)
+    else:
+        st.write("No data available for selected regions in the chosen year.")
+
+@section
+def intensity_section(selected_year, source_columns):
     st.header("Source Intensity Analysis")
     st.write(
         "This section analyzes which countries have the highest intensity of specific emission sources "
         "relative to their total emissions."
     )
     
-    source_intensity = year_df.copy()
-    for source in source_columns:
-        source_intensity[f"{source}_intensity"] = (source_intensity[source] / source_intensity['Total']) * 100
-    
     selected_source = st.selectbox(
         "Select emission source for intensity analysis:",
         options=source_columns,
@@ -175,26 +164,40 @@ def main():
     )
     
     min_emissions = 10
-    significant_countries = source_intensity[source_intensity['Total'] >= min_emissions]
-    
     intensity_column = f"{selected_source}_intensity"
-    top_by_intensity = significant_countries.sort_values(intensity_column, ascending=False).head(config.TOP_N_COUNTRIES)
+    top_by_intensity = get_top_by_metric('emissions', intensity_column, selected_year, config.TOP_N_COUNTRIES, min_total=min_emissions)
     
-    fig5 = px.bar(
+    fig5 = create_horizontal_bar_comparison(
         top_by_intensity,
-        y='Country',
-        x=intensity_column,
-        title=f"Top {config.TOP_N_COUNTRIES} Countries by {selected_source} Intensity ({selected_year})",
-        height=config.DEFAULT_CHART_HEIGHT,
-        orientation='h',
+        'Country',
+        intensity_column,
+        f"Top {config.TOP_N_COUNTRIES} Countries by {selected_source} Intensity ({selected_year})",
         labels={intensity_column: f"% of Total Emissions", "Country": ""},
-        color=intensity_column,
         color_continuous_scale="Viridis",
-        template="plotly_white"
+        text_auto=False,
+        data_key=('emissions', selected_year, min_emissions)
     )
     
-    fig5.update_layout(yaxis={'categoryorder': 'total ascending'})
     st.plotly_chart(fig5, use_container_width=True)
 
+def main():
+    st.title("CO2 Emission Sources Analysis")
+    st.write("Analyze the contribution of different emission sources and how they've changed over time.")
+    
+    df = load_emissions_data()
+    
+    st.sidebar.header("Filters")
+    start_year, end_year = add_year_range_selector(df)
+    selected_year = add_year_selector(df, default=config.DEFAULT_END_YEAR, label="Focus Year")
+    selected_regions = add_region_filter()
+    
+    source_columns = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
+    
+    source_pie_section(selected_year)
+    source_evolution_section(start_year, end_year, source_columns)
+    if selected_regions:
+        region_section(selected_year, selected_regions, source_columns)
+    intensity_section(selected_year, source_columns)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,36 +9,33 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import config
-from src.data_processing.loader import load_emissions_data, load_per_capita_data
+from src.data_processing.aggregator import get_year_data, get_countries_data, get_country_year_pairs
+from src.visualizations.figure_cache import get_figure
+from src.visualizations import theme
+from src.visualizations.time_series import downsample_frame
+from src.visualizations.comparison_charts import get_render_mode
+from components.data import load_emissions_data
 from components.sidebar import add_year_selector
 from components.filters import add_multi_country_selector
+from components.sections import section
 
 st.set_page_config(page_title=f"Comparative Analysis - {config.APP_TITLE}", page_icon=config.APP_ICON, layout="wide")
 
-def main():
-    st.title("Comparative CO2 Emissions Analysis")
-    st.write("Compare emissions across countries and analyze relationships between different metrics.")
+@section
+def comparison_section(selected_year, selected_countries):
+    st.header(f"Country Comparison for {selected_year}")
     
-    emissions_df = load_emissions_data()
-    per_capita_df = load_per_capita_data()
+    year_emissions = get_year_data('emissions', selected_year)
+    year_per_capita = get_year_data('per_capita', selected_year)
     
-    st.sidebar.header("Filters")
-    selected_year = add_year_selector(emissions_df, default=config.DEFAULT_END_YEAR)
-    selected_countries = add_multi_country_selector(emissions_df, max_selections=5)
+    countries_data = year_emissions[year_emissions['Country'].isin(selected_countries)]
+    countries_per_capita = year_per_capita[year_per_capita['Country'].isin(selected_countries)]
     
-    year_emissions = emissions_df[emissions_df['Year'] == selected_year]
-    year_per_capita = per_capita_df[per_capita_df['Year'] == selected_year]
+    col1, col2 = st.columns(2)
     
-    if selected_countries:
-        st.header(f"Country Comparison for {selected_year}")
-        
-        countries_data = year_emissions[year_emissions['Country'].isin(selected_countries)]
-        countries_per_capita = year_per_capita[year_per_capita['Country'].isin(selected_countries)]
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig1 = px.bar(
+    with col1:
+        def build_total_chart():
+            fig = px.bar(
                 countries_data,
                 x='Country',
                 y='Total',
@@ -46,13 +43,17 @@ def main():
                 height=config.DEFAULT_CHART_HEIGHT,
                 labels={"Total": "Million Tonnes CO2", "Country": ""},
                 color='Country',
-                template="plotly_white"
+                template=theme.CHART_TEMPLATE
             )
             
-            st.plotly_chart(fig1, use_container_width=True)
+            return fig
         
-        with col2:
-            fig2 = px.bar(
+        fig1 = get_figure('comparative.total', ('emissions', selected_year), selected_countries, build_total_chart)
+        st.plotly_chart(fig1, use_container_width=True)
+    
+    with col2:
+        def build_per_capita_chart():
+            fig = px.bar(
                 countries_per_capita,
                 x='Country',
                 y='Total',
@@ -60,16 +61,20 @@ def main():
                 height=config.DEFAULT_CHART_HEIGHT,
                 labels={"Total": "Tonnes CO2 per Capita", "Country": ""},
                 color='Country',
-                template="plotly_white"
+                template=theme.CHART_TEMPLATE
             )
             
-            st.plotly_chart(fig2, use_container_width=True)
-        
-        st.header(f"Source Breakdown Comparison ({selected_year})")
+            return fig
         
-        source_columns = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
-        
-        fig3 = px.bar(
+        fig2 = get_figure('comparative.per_capita', ('per_capita', selected_year), selected_countries, build_per_capita_chart)
+        st.plotly_chart(fig2, use_container_width=True)
+    
+    st.header(f"Source Breakdown Comparison ({selected_year})")
+    
+    source_columns = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
+    
+    def build_source_chart():
+        fig = px.bar(
             countries_data,
             x='Country',
             y=source_columns,
@@ -77,16 +82,22 @@ def main():
             height=config.DEFAULT_CHART_HEIGHT,
             labels={"value": "Million Tonnes CO2", "Country": ""},
             color_discrete_map=config.EMISSION_SOURCES_COLORS,
-            template="plotly_white"
+            template=theme.CHART_TEMPLATE
         )
         
-        st.plotly_chart(fig3, use_container_width=True)
-        
-        st.header("Historical Emissions Trend Comparison")
-        
-        countries_history = emissions_df[emissions_df['Country'].isin(selected_countries)]
+        return fig
+    
+    fig3 = get_figure('comparative.sources', ('emissions', selected_year), selected_countries, build_source_chart)
+    st.plotly_chart(fig3, use_container_width=True)
+
+@section
+def history_section(selected_countries):
+    st.header("Historical Emissions Trend Comparison")
+    
+    def build_history_chart():
+        countries_history = downsample_frame(get_countries_data('emissions', selected_countries), 'Year', 'Total', 'Country')
         
-        fig4 = px.line(
+        fig = px.line(
             countries_history,
             x='Year',
             y='Total',
@@ -94,15 +105,20 @@ def main():
             title="Historical Total Emissions Comparison",
             height=config.DEFAULT_CHART_HEIGHT,
             labels={"Total": "Million Tonnes CO2", "Year": "Year"},
-            template="plotly_white"
+            template=theme.CHART_TEMPLATE
         )
         
-        fig4.update_layout(hovermode="x unified")
-        st.plotly_chart(fig4, use_container_width=True)
+        fig.update_layout(hovermode="x unified")
         
-        countries_pc_history = per_capita_df[per_capita_df['Country'].isin(selected_countries)]
+        return fig
+    
+    fig4 = get_figure('comparative.history', ('emissions',), selected_countries, build_history_chart)
+    st.plotly_chart(fig4, use_container_width=True)
+    
+    def build_per_capita_history_chart():
+        countries_pc_history = downsample_frame(get_countries_data('per_capita', selected_countries), 'Year', 'Total', 'Country')
         
-        fig5 = px.line(
+        fig = px.line(
             countries_pc_history,
             x='Year',
             y='Total',
@@ -110,52 +126,107 @@ def main():
             title="Historical Per Capita Emissions Comparison",
             height=config.DEFAULT_CHART_HEIGHT,
             labels={"Total": "Tonnes CO2 per Capita", "Year": "Year"},
-            template="plotly_white"
+            template=theme.CHART_TEMPLATE
         )
         
-        fig5.update_layout(hovermode="x unified")
-        st.plotly_chart(fig5, use_container_width=True)
-    
-    st.header(f"Total vs. Per Capita Emissions ({selected_year})")
-    
-    merged_df = pd.merge(
-        year_emissions[['Country', 'Total']],
-        year_per_capita[['Country', 'Total']],
-        on='Country',
-        suffixes=('_total', '_per_capita')
-    )
-    
-    fig6 = px.scatter(
-        merged_df,
-        x='Total_total',
-        y='Total_per_capita',
-        hover_name='Country',
-        title=f"Total vs. Per Capita Emissions ({selected_year})",
-        height=config.DEFAULT_CHART_HEIGHT,
-        labels={
-            "Total_total": "Total Emissions (Million Tonnes CO2)",
-            "Total_per_capita": "Per Capita Emissions (Tonnes CO2)"
-        },
-        template="plotly_white",
-        log_x=True 
-    )
-    
-    if selected_countries:
-        selected_data = merged_df[merged_df['Country'].isin(selected_countries)]
+        fig.update_layout(hovermode="x unified")
         
-        fig6.add_trace(
-            go.Scatter(
-                x=selected_data['Total_total'],
-                y=selected_data['Total_per_capita'],
-                mode='markers+text',
-                marker=dict(size=12, color='red'),
-                text=selected_data['Country'],
-                textposition='top center',
-                name='Selected Countries'
+        return fig
+    
+    fig5 = get_figure('comparative.per_capita_history', ('per_capita',), selected_countries, build_per_capita_history_chart)
+    st.plotly_chart(fig5, use_container_width=True)
+
+@section
+def scatter_section(selected_year, selected_countries):
+    scatter_mode = st.radio("Scatter points", ["Selected year", "All years"], horizontal=True)
+    all_years = scatter_mode == "All years"
+    scatter_title = "Total vs. Per Capita Emissions (all years)" if all_years else f"Total vs. Per Capita Emissions ({selected_year})"
+    
+    st.header(scatter_title)
+    
+    def build_scatter_chart():
+        if all_years:
+            merged_df = get_country_year_pairs('emissions', 'per_capita', 'Total', suffixes=('_total', '_per_capita'))
+        else:
+            merged_df = pd.merge(
+                get_year_data('emissions', selected_year)[['Country', 'Total']],
+                get_year_data('per_capita', selected_year)[['Country', 'Total']],
+                on='Country',
+                suffixes=('_total', '_per_capita')
             )
+        
+        render_mode = get_render_mode(len(merged_df))
+        
+        fig = px.scatter(
+            merged_df,
+            x='Total_total',
+            y='Total_per_capita',
+            hover_name='Country',
+            hover_data=['Year'] if all_years else None,
+            title=scatter_title,
+            height=config.DEFAULT_CHART_HEIGHT,
+            labels={
+                "Total_total": "Total Emissions (Million Tonnes CO2)",
+                "Total_per_capita": "Per Capita Emissions (Tonnes CO2)"
+            },
+            template=theme.CHART_TEMPLATE,
+            opacity=0.3 if all_years else None,
+            render_mode=render_mode,
+            log_x=True 
         )
+        
+        if selected_countries and all_years:
+            # Each selected country's path through the scatter, in year order.
+            trajectory_trace = go.Scattergl if render_mode == 'webgl' else go.Scatter
+            for country in selected_countries:
+                trajectory = merged_df[merged_df['Country'] == country]
+                
+                fig.add_trace(
+                    trajectory_trace(
+                        x=trajectory['Total_total'],
+                        y=trajectory['Total_per_capita'],
+                        mode='lines+markers',
+                        marker=dict(size=4),
+                        customdata=trajectory['Year'],
+                        hovertemplate=f"<b>{country}</b><br>Year=%{{customdata}}<br>Total=%{{x}}<br>Per capita=%{{y}}<extra></extra>",
+                        name=country
+                    )
+                )
+        elif selected_countries:
+            selected_data = merged_df[merged_df['Country'].isin(selected_countries)]
+            
+            fig.add_trace(
+                go.Scatter(
+                    x=selected_data['Total_total'],
+                    y=selected_data['Total_per_capita'],
+                    mode='markers+text',
+                    marker=dict(size=12, color='red'),
+                    text=selected_data['Country'],
+                    textposition='top center',
+                    name='Selected Countries'
+                )
+            )
+        
+        return fig
     
+    scatter_key = ('emissions',) if all_years else ('emissions', selected_year)
+    fig6 = get_figure('comparative.scatter', scatter_key, (scatter_mode, selected_countries), build_scatter_chart)
     st.plotly_chart(fig6, use_container_width=True)
 
+def main():
+    st.title("Comparative CO2 Emissions Analysis")
+    st.write("Compare emissions across countries and analyze relationships between different metrics.")
+    
+    emissions_df = load_emissions_data()
+    
+    st.sidebar.header("Filters")
+    selected_year = add_year_selector(emissions_df, default=config.DEFAULT_END_YEAR)
+    selected_countries = add_multi_country_selector(emissions_df, max_selections=5)
+    
+    if selected_countries:
+        comparison_section(selected_year, selected_countries)
+        history_section(selected_countries)
+    scatter_section(selected_year, selected_countries)
+
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
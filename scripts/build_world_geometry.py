@@ -0,0 +1,295 @@
+"""
+Builds the bundled world geometry used by the choropleth maps (config.WORLD_GEOMETRY_FILE)
+from the Natural Earth 1:110m Admin 0 countries shapefile (public domain). Run from the
+repository root:
+    
+    python scripts/build_world_geometry.py path/to/ne_110m_admin_0_countries.shp
+
+States and territories too small for the 1:110m scale are added as square markers, and
+French Guiana is split from France, so every country in the emissions data has a shape.
+Borders shared by two countries are split into arcs that are simplified once and reused by
+both, so neighbours stay gap-free at every level of detail. The output is TopoJSON with one
+GeometryCollection per level, features keyed by ISO 3166-1 alpha-3 code. Needs pyshp at
+build time only.
+"""
+
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+# Douglas-Peucker tolerance in degrees per level; 0 keeps the source geometry.
+LEVEL_TOLERANCES = {'low': 0.5, 'medium': 0.15, 'high': 0.0}
+# Coordinates are stored as integers on a grid of this many degrees.
+GRID = 0.01
+# Natural Earth leaves these without an ISO code.
+ISO_OVERRIDES = {'Kosovo': 'KSV'}
+# Overseas parts listed under another country, moved to their own feature: ISO code -> (owner,
+# name, a point inside the part).
+SPLIT_TERRITORIES = {'GUF': ('FRA', 'French Guiana', (-53.0, 4.0))}
+# States and territories the 1:110m data leaves out, drawn as a square of MARKER_SIZE degrees
+# centred on (longitude, latitude).
+SMALL_STATES = {
+    'ABW': (-69.97, 12.52), 'AIA': (-63.05, 18.22), 'AND': (1.55, 42.55), 'ATG': (-61.80, 17.08),
+    'BES': (-68.26, 12.18), 'BHR': (50.56, 26.07), 'BMU': (-64.78, 32.30), 'BRB': (-59.56, 13.17),
+    'COK': (-159.78, -21.23), 'COM': (43.33, -11.70), 'CPV': (-23.60, 15.10), 'CUW': (-68.93, 12.17),
+    'CXR': (105.69, -10.48), 'DMA': (-61.36, 15.42), 'FRO': (-6.91, 62.00), 'FSM': (158.22, 6.88),
+    'GLP': (-61.55, 16.25), 'GRD': (-61.68, 12.12), 'HKG': (114.17, 22.32), 'KIR': (173.02, 1.34),
+    'KNA': (-62.75, 17.33), 'LCA': (-60.97, 13.91), 'LIE': (9.55, 47.16), 'MAC': (113.55, 22.17),
+    'MDV': (73.51, 4.17), 'MHL': (171.38, 7.10), 'MLT': (14.44, 35.89), 'MSR': (-62.19, 16.74),
+    'MTQ': (-61.02, 14.64), 'MUS': (57.57, -20.28), 'MYT': (45.14, -12.83), 'NIU': (-169.87, -19.05),
+    'NRU': (166.93, -0.53), 'PLW': (134.58, 7.51), 'PYF': (-149.43, -17.65), 'REU': (55.53, -21.12),
+    'SGP': (103.82, 1.35), 'SHN': (-5.72, -15.95), 'SPM': (-56.27, 46.88), 'STP': (6.61, 0.23),
+    'SXM': (-63.05, 18.03), 'SYC': (55.49, -4.68), 'TCA': (-71.80, 21.78), 'TON': (-175.20, -21.18),
+    'TUV': (179.20, -8.52), 'VCT': (-61.20, 13.25), 'VGB': (-64.62, 18.43), 'WLF': (-176.20, -13.28),
+    'WSM': (-172.10, -13.75)
+}
+MARKER_SIZE = 0.8
+
+def read_countries(path):
+    import shapefile
+    
+    reader = shapefile.Reader(path)
+    fields = [field[0].lower() for field in reader.fields[1:]]
+    iso_field = 'adm0_a3' if 'adm0_a3' in fields else 'iso_a3'
+    
+    countries = []
+    for shape_record in reader.iterShapeRecords():
+        record = dict(zip(fields, shape_record.record))
+        iso = ISO_OVERRIDES.get(record['name'], record[iso_field])
+        if not iso or iso == '-99':
+            continue
+        
+        shape = shape_record.shape
+        bounds = list(shape.parts) + [len(shape.points)]
+        # Rings are closed in the shapefile; the repeated last point is dropped here.
+        rings = [[tuple(point) for point in shape.points[start:stop - 1]] for start, stop in zip(bounds[:-1], bounds[1:])]
+        countries.append({'iso': iso, 'name': record['name'], 'rings': [ring for ring in rings if len(ring) >= 3]})
+    
+    return countries
+
+def square(center):
+    # Clockwise, like the shapefile's exterior rings.
+    x, y = center
+    h = MARKER_SIZE / 2
+    return [(x - h, y - h), (x - h, y + h), (x + h, y + h), (x + h, y - h)]
+
+def add_missing_countries(countries, names):
+    by_iso = {country['iso']: country for country in countries}
+    for iso, (owner, name, point) in SPLIT_TERRITORIES.items():
+        parent = by_iso[owner]
+        parts = [polygon for polygon in parent['polygons'] if contains(polygon[0], point)]
+        parent['polygons'] = [polygon for polygon in parent['polygons'] if not contains(polygon[0], point)]
+        countries.append({'iso': iso, 'name': name, 'polygons': parts})
+    
+    for iso, center in SMALL_STATES.items():
+        if iso not in by_iso:
+            countries.append({'iso': iso, 'name': names.get(iso, [iso])[0], 'polygons': [[square(center)]]})
+    
+    return countries
+
+def signed_area(ring):
+    x, y = np.asarray(ring).T
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+def contains(ring, point):
+    x, y = np.asarray(ring).T
+    px, py = point
+    crosses = (y > py) != (np.roll(y, -1) > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x + (py - y) * (np.roll(x, -1) - x) / (np.roll(y, -1) - y)
+    return bool(np.count_nonzero(crosses & (px < x_cross)) % 2)
+
+def group_polygons(rings):
+    # Shapefile exteriors run clockwise (negative area) and holes counter-clockwise.
+    exteriors = [ring for ring in rings if signed_area(ring) < 0]
+    polygons = [[ring] for ring in exteriors]
+    for hole in (ring for ring in rings if signed_area(ring) >= 0):
+        owner = next((polygon for polygon in polygons if contains(polygon[0], hole[0])), None)
+        if owner is not None:
+            owner.append(hole)
+    return polygons
+
+def split_arcs(countries):
+    # A vertex starts or ends an arc where the set of rings it belongs to changes, so
+    # every stretch of shared border becomes one arc used by both neighbours.
+    rings = [ring for country in countries for polygon in country['polygons'] for ring in polygon]
+    membership = {}
+    for ring_id, ring in enumerate(rings):
+        for point in ring:
+            membership.setdefault(point, set()).add(ring_id)
+    
+    ring_arcs = []
+    for ring in rings:
+        members = [frozenset(membership[point]) for point in ring]
+        n = len(ring)
+        cuts = [i for i in range(n) if members[i] != members[i - 1] or members[i] != members[(i + 1) % n]]
+        
+        if not cuts:
+            ring_arcs.append([ring + [ring[0]]])
+            continue
+        
+        arcs = []
+        for start, stop in zip(cuts, cuts[1:] + [cuts[0] + n]):
+            arcs.append([ring[i % n] for i in range(start, stop + 1)])
+        ring_arcs.append(arcs)
+    
+    return rings, ring_arcs
+
+def douglas_peucker(points, tolerance):
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    
+    points = np.asarray(points)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    
+    while stack:
+        start, stop = stack.pop()
+        if stop - start < 2:
+            continue
+        
+        a, b = points[start], points[stop]
+        segment = points[start + 1:stop] - a
+        chord = b - a
+        length = np.hypot(*chord)
+        if length == 0:
+            distances = np.hypot(segment[:, 0], segment[:, 1])
+        else:
+            distances = np.abs(chord[0] * segment[:, 1] - chord[1] * segment[:, 0]) / length
+        
+        farthest = int(distances.argmax())
+        if distances[farthest] > tolerance:
+            middle = start + 1 + farthest
+            keep[middle] = True
+            stack.extend([(start, middle), (middle, stop)])
+    
+    return [tuple(point) for point in points[keep]]
+
+def simplify_arc(arc, tolerance):
+    if arc[0] != arc[-1]:
+        return douglas_peucker(arc, tolerance)
+    
+    # A closed island ring is split at the vertex farthest from its start so both halves have fixed ends.
+    distances = np.hypot(*(np.asarray(arc) - arc[0]).T)
+    far = int(distances.argmax())
+    return douglas_peucker(arc[:far + 1], tolerance)[:-1] + douglas_peucker(arc[far:], tolerance)
+
+def quantize(points):
+    grid = np.rint((np.asarray(points) - [-180, -90]) / GRID).astype(np.int64)
+    # Consecutive points that land on the same grid cell are merged.
+    distinct = np.r_[True, (np.diff(grid, axis=0) != 0).any(axis=1)]
+    return [tuple(point) for point in grid[distinct]]
+
+class ArcTable:
+    def __init__(self):
+        self.arcs = []
+        self.index = {}
+    
+    def add(self, points):
+        # Returns the TopoJSON arc reference, reusing an arc already stored in either direction.
+        key = tuple(points)
+        if key in self.index:
+            return self.index[key]
+        reverse = tuple(reversed(points))
+        if reverse in self.index:
+            return ~self.index[reverse]
+        
+        self.index[key] = len(self.arcs)
+        self.arcs.append(points)
+        return self.index[key]
+    
+    def encoded(self):
+        # Delta-encoded as the TopoJSON spec allows for quantized topologies.
+        return [np.diff(np.asarray(arc), axis=0, prepend=[[0, 0]]).tolist() for arc in self.arcs]
+
+def ring_length(arcs):
+    return sum(len(arc) - 1 for arc in arcs)
+
+def build_level(countries, ring_arcs, tolerance, table):
+    simplified = {}
+    
+    def simplify(arc):
+        # Each shared arc is simplified once, in one direction, and reused by both neighbours.
+        key = min(tuple(arc), tuple(reversed(arc)))
+        if key not in simplified:
+            simplified[key] = quantize(simplify_arc(list(key), tolerance))
+        return simplified[key] if key == tuple(arc) else simplified[key][::-1]
+    
+    geometries = []
+    ring_id = 0
+    for country in countries:
+        polygons = []
+        for polygon in country['polygons']:
+            refs = []
+            for ring_position in range(len(polygon)):
+                # Arcs shorter than one grid cell quantize to a single point and are dropped.
+                arcs = [arc for arc in (simplify(arc) for arc in ring_arcs[ring_id + ring_position]) if len(arc) >= 2]
+                if ring_length(arcs) >= 3:
+                    refs.append([table.add(arc) for arc in arcs])
+                elif ring_position == 0:
+                    break
+            ring_id += len(polygon)
+            if refs:
+                polygons.append(refs)
+        
+        if not polygons:
+            # Everything collapsed: keep the source outline of the largest part instead.
+            largest = max(country['polygons'], key=lambda polygon: abs(signed_area(polygon[0])))
+            polygons = [[[table.add(quantize(largest[0] + [largest[0][0]]))]]]
+        
+        geometry = {'type': 'Polygon', 'arcs': polygons[0]} if len(polygons) == 1 else {'type': 'MultiPolygon', 'arcs': polygons}
+        geometry.update({'id': country['iso'], 'properties': {'name': country['name'], 'names': country['names']}})
+        geometries.append(geometry)
+    
+    return {'type': 'GeometryCollection', 'geometries': geometries}
+
+def dataset_names():
+    # Country names as the emissions file spells them, so maps keyed by name can find their shapes.
+    df = pd.read_csv(config.TOTAL_EMISSIONS_FILE, usecols=['Country', 'ISO 3166-1 alpha-3']).dropna().drop_duplicates()
+    return df.groupby('ISO 3166-1 alpha-3')['Country'].agg(list).to_dict()
+
+def build(path):
+    countries = read_countries(path)
+    names = dataset_names()
+    for country in countries:
+        country['polygons'] = group_polygons(country['rings'])
+    
+    countries = add_missing_countries(countries, names)
+    for country in countries:
+        country['names'] = sorted({country['name'], *names.get(country['iso'], [])})
+    
+    _, ring_arcs = split_arcs(countries)
+    
+    table = ArcTable()
+    objects = {level: build_level(countries, ring_arcs, tolerance, table) for level, tolerance in LEVEL_TOLERANCES.items()}
+    
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [GRID, GRID], 'translate': [-180, -90]},
+        'objects': objects,
+        'arcs': table.encoded()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('shapefile', help="Natural Earth 1:110m Admin 0 countries shapefile")
+    parser.add_argument('--output', default=config.WORLD_GEOMETRY_FILE)
+    args = parser.parse_args()
+    
+    topology = build(args.shapefile)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(topology, f, separators=(',', ':'))
+    
+    print(f"Wrote {args.output}: {len(topology['objects']['high']['geometries'])} countries, {len(topology['arcs'])} arcs, {os.path.getsize(args.output) / 1e3:.0f} KB")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
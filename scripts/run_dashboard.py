@@ -0,0 +1,67 @@
+"""
+Starts the dashboard with its caches already warm. Run from the repository root in place
+of `streamlit run Introduction.py`; any other arguments are passed on to Streamlit:
+    
+    python scripts/run_dashboard.py [--no-warm-up] [--server.port 8501 ...]
+
+Before the server starts, this process loads the datasets, builds their indexes and renders
+every page once with its default widget values. Streamlit then runs the pages in this same
+process, so the first visitor is served from the dataset store, the result caches and the
+figure cache. Each step's duration is logged.
+"""
+
+import os
+import sys
+import glob
+import logging
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import config
+from src.data_processing.warmup import timed, warm_up_data
+
+logger = logging.getLogger(__name__)
+
+MAIN_SCRIPT = os.path.join(ROOT, 'Introduction.py')
+
+def page_scripts():
+    return [MAIN_SCRIPT] + sorted(glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+
+def warm_up_pages(timings):
+    # AppTest runs a page headlessly in this process with its widgets at their defaults, which
+    # fills the same caches a real first visit would.
+    from streamlit.testing.v1 import AppTest
+    
+    for script in page_scripts():
+        page = os.path.relpath(script, ROOT)
+        with timed(page, timings):
+            app = AppTest.from_file(script, default_timeout=config.WARM_UP_PAGE_TIMEOUT).run()
+        if app.exception:
+            logger.warning("Warm-up: %s raised %s", page, app.exception[0].message)
+
+def warm_up():
+    timings = {}
+    with timed('total', timings):
+        warm_up_data(timings)
+        warm_up_pages(timings)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--no-warm-up', action='store_true', help="Start the server without warming the caches")
+    args, streamlit_args = parser.parse_known_args()
+    
+    logging.basicConfig(format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    logging.getLogger('src.data_processing.warmup').setLevel(logging.INFO)
+    
+    if not args.no_warm_up:
+        warm_up()
+    
+    from streamlit.web import cli
+    sys.argv = ['streamlit', 'run', MAIN_SCRIPT, *streamlit_args]
+    sys.exit(cli.main())
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
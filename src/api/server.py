@@ -0,0 +1,271 @@
+"""
+Read-only HTTP API over the aggregator, for tools that need the dashboard's numbers
+without the UI. Standard library only (pyarrow adds the Arrow format). Run from the
+repository root:
+    
+    python -m src.api.server [--host 127.0.0.1] [--port 8502]
+
+Every endpoint is a GET taking query parameters and answering from the process-wide
+dataset store the dashboard uses:
+    
+    /datasets                   dataset names and version tokens
+    /aggregate/year             dataset, column
+    /aggregate/region           dataset, column, year, regions (comma-separated)
+    /top-emitters               dataset, column, year, n
+    /growth-rates               dataset, column, periods (comma-separated), year
+    /countries                  dataset, countries (comma-separated): per-country series
+
+Tables come back as JSON records, or as an Arrow IPC stream with format=arrow or
+"Accept: application/vnd.apache.arrow.stream". ETags are derived from the dataset
+version and the parsed parameters, so a matching If-None-Match is answered with 304
+before anything is computed; bodies are gzipped when the client accepts it.
+"""
+
+import os
+import sys
+import gzip
+import json
+import hashlib
+import logging
+import argparse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import config
+from src.data_processing import aggregator
+from src.data_processing.loader import get_dataset_store, get_dataset_version, get_dataset_error
+from src.utils.cache import ResultCache, register_cache, freeze
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_MEDIA_TYPE = 'application/json'
+
+response_cache = register_cache(
+    ResultCache('api.responses', config.API_RESPONSE_CACHE_ENTRIES, config.CACHE_TTL_SECONDS)
+)
+
+class BadRequest(ValueError):
+    pass
+
+def _one(params, name, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+def _int(params, name, default=None, minimum=None):
+    value = _one(params, name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an integer")
+    if minimum is not None and value < minimum:
+        raise BadRequest(f"'{name}' must be at least {minimum}")
+    return value
+
+def _list(params, name, default=None):
+    # Accepts both name=a,b and name=a&name=b.
+    values = [item.strip() for value in params.get(name, []) for item in value.split(',') if item.strip()]
+    return values or default
+
+def _int_list(params, name, default=None, minimum=None):
+    # Repeated values are dropped, keeping the first occurrence.
+    values = _list(params, name)
+    if values is None:
+        return default
+    try:
+        values = list(dict.fromkeys(int(value) for value in values))
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a comma-separated list of integers")
+    if minimum is not None and min(values) < minimum:
+        raise BadRequest(f"'{name}' values must be at least {minimum}")
+    return values
+
+def _dataset(params):
+    dataset = _one(params, 'dataset', 'emissions')
+    if dataset not in get_dataset_store().names:
+        raise BadRequest(f"Unknown dataset '{dataset}'")
+    return dataset
+
+def _column(params):
+    return _one(params, 'column', 'Total')
+
+def _aggregate_year(params):
+    return aggregator.aggregate_by_year, dict(dataset=_dataset(params), column=_column(params))
+
+def _aggregate_region(params):
+    return aggregator.aggregate_by_region, dict(
+        dataset=_dataset(params), column=_column(params), year=_int(params, 'year'), regions=_list(params, 'regions')
+    )
+
+def _top_emitters(params):
+    return aggregator.get_top_emitters, dict(
+        dataset=_dataset(params), column=_column(params), year=_int(params, 'year'), n=_int(params, 'n', config.TOP_N_COUNTRIES, minimum=1)
+    )
+
+def _growth_rates(params):
+    return aggregator.calculate_growth_rates, dict(
+        dataset=_dataset(params), column=_column(params), periods=_int_list(params, 'periods', [5, 10, 20], minimum=1), year=_int(params, 'year')
+    )
+
+def _countries(params):
+    countries = _list(params, 'countries') or _list(params, 'country')
+    if not countries:
+        raise BadRequest("'countries' is required")
+    return aggregator.get_countries_data, dict(dataset=_dataset(params), countries=countries)
+
+ROUTES = {
+    '/aggregate/year': _aggregate_year,
+    '/aggregate/region': _aggregate_region,
+    '/top-emitters': _top_emitters,
+    '/growth-rates': _growth_rates,
+    '/countries': _countries
+}
+
+def get_etag(path, version, kwargs, media_type):
+    # Weak: the gzipped and identity bodies are the same representation.
+    token = repr((path, version, freeze(kwargs), media_type))
+    return f'W/"{hashlib.sha1(token.encode()).hexdigest()[:20]}"'
+
+def _etag_matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or any(tag.removeprefix('W/') == etag.removeprefix('W/') for tag in candidates)
+
+def encode_json(df):
+    return df.to_json(orient='records').encode()
+
+def encode_arrow(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def _wants_arrow(params, accept):
+    requested = _one(params, 'format')
+    if requested is not None:
+        if requested not in ('json', 'arrow'):
+            raise BadRequest("'format' must be 'json' or 'arrow'")
+        return requested == 'arrow'
+    return ARROW_MEDIA_TYPE in (accept or '')
+
+def _accepts_gzip(accept_encoding):
+    return any(coding.split(';')[0].strip() == 'gzip' for coding in (accept_encoding or '').split(','))
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = 'GCBDashboardAPI/1.0'
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+    
+    def _send(self, status, body=b'', media_type=JSON_MEDIA_TYPE, etag=None, compressible=True):
+        headers = {'Vary': 'Accept, Accept-Encoding', 'Cache-Control': 'no-cache'}
+        if etag is not None:
+            headers['ETag'] = etag
+        
+        if compressible and len(body) >= config.API_GZIP_MIN_BYTES and _accepts_gzip(self.headers.get('Accept-Encoding')):
+            body = gzip.compress(body, compresslevel=config.API_GZIP_LEVEL)
+            headers['Content-Encoding'] = 'gzip'
+        
+        self.send_response(status)
+        if status != HTTPStatus.NOT_MODIFIED:
+            headers['Content-Type'] = media_type
+        headers['Content-Length'] = str(len(body))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+    
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode(), compressible=False)
+    
+    def do_HEAD(self):
+        self.do_GET()
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        
+        try:
+            if url.path == '/datasets':
+                store = get_dataset_store()
+                body = json.dumps([{'name': name, 'version': get_dataset_version(name)} for name in store.names]).encode()
+                self._send(HTTPStatus.OK, body)
+                return
+            
+            if url.path not in ROUTES:
+                self._send_error(HTTPStatus.NOT_FOUND, f"No endpoint at {url.path}")
+                return
+            
+            func, kwargs = ROUTES[url.path](params)
+            arrow = _wants_arrow(params, self.headers.get('Accept'))
+        except BadRequest as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        
+        if arrow and pa is None:
+            self._send_error(HTTPStatus.NOT_ACCEPTABLE, "Arrow output needs pyarrow")
+            return
+        
+        version = get_dataset_version(kwargs['dataset'])
+        error = get_dataset_error(kwargs['dataset'])
+        if version is None and error is not None:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(error))
+            return
+        
+        media_type = ARROW_MEDIA_TYPE if arrow else JSON_MEDIA_TYPE
+        etag = get_etag(url.path, version, kwargs, media_type)
+        if _etag_matches(self.headers.get('If-None-Match'), etag):
+            self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+            return
+        
+        found, body = response_cache.get(etag)
+        if not found:
+            try:
+                df = func(**kwargs)
+                body = encode_arrow(df) if arrow else encode_json(df)
+            except Exception as e:
+                # Answer with a status line rather than dropping the connection.
+                logger.exception("Error answering %s", self.path)
+                self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Internal error: {e}")
+                return
+            response_cache.set(etag, body)
+        
+        self._send(HTTPStatus.OK, body, media_type=media_type, etag=etag)
+
+def make_server(host=None, port=None):
+    return ThreadingHTTPServer((host or config.API_HOST, config.API_PORT if port is None else port), ApiHandler)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default=config.API_HOST)
+    parser.add_argument('--port', type=int, default=config.API_PORT)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    
+    server = make_server(args.host, args.port)
+    logger.info("Serving on http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
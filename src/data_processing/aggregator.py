@@ -1,115 +1,373 @@
 import pandas as pd
 import numpy as np
-import streamlit as st
 import config
-from src.data_processing.loader import get_country_codes
+from src.data_processing.loader import get_dataset_store, get_dataset_version
+from src.data_processing.ranking import rankable_countries
+from src.utils.cache import cached
 
-@st.cache_data
-def aggregate_by_year(df, column='Total'):
-    if df.empty or column not in df.columns:
+SOURCE_COLUMNS = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
+
+dataset_cache = cached(version_of=get_dataset_version)
+
+def _get_cube(dataset):
+    return get_dataset_store().cube(dataset)
+
+def _get_rollup(dataset):
+    return get_dataset_store().rollup(dataset)
+
+@dataset_cache
+def aggregate_by_year(dataset='emissions', column='Total'):
+    return aggregate_by_year_range(dataset, column)
+
+@dataset_cache
+def aggregate_by_region(dataset='emissions', column='Total', year=None, regions=None):
+    rollup = _get_rollup(dataset)
+    if rollup is None or not rollup.has_measure(column):
         return pd.DataFrame()
     
-    aggregated = df.groupby('Year')[column].sum().reset_index()
-    return aggregated
+    regions = rollup.regions if regions is None else [r for r in regions if r in rollup.group_index]
+    start_year, end_year = (rollup.years[0], rollup.years[-1]) if year is None else (year, year)
+    
+    return pd.DataFrame({
+        'Region': regions,
+        column: rollup.range_total([column], start_year, end_year, groups=regions)[:, 0]
+    })
 
-@st.cache_data
-def aggregate_by_region(df, column='Total', year=None):
-    if df.empty or column not in df.columns:
+@dataset_cache
+def aggregate_by_region_and_source(dataset='emissions', year=None, regions=None):
+    rollup = _get_rollup(dataset)
+    if rollup is None:
         return pd.DataFrame()
     
-    if year is not None:
-        df = df[df['Year'] == year]
+    source_columns = [col for col in SOURCE_COLUMNS if rollup.has_measure(col)]
+    regions = rollup.regions if regions is None else [r for r in regions if r in rollup.group_index]
+    if not source_columns or not regions:
+        return pd.DataFrame()
     
-    region_map = {}
-    for region, countries in config.REGIONS.items():
-        for country_code in countries:
-            region_map[country_code] = region
+    start_year, end_year = (rollup.years[0], rollup.years[-1]) if year is None else (year, year)
     
-    df_with_region = df.copy()
-    df_with_region['Region'] = df_with_region['ISO 3166-1 alpha-3'].map(region_map)
+    result = pd.DataFrame(
+        rollup.range_total(source_columns, start_year, end_year, groups=regions),
+        columns=source_columns
+    )
+    result.insert(0, 'Region', regions)
+    return result
+
+@dataset_cache
+def aggregate_by_source(dataset='emissions', year=None, country=None):
+    cube = _get_cube(dataset)
+    if cube is None:
+        return pd.DataFrame()
     
-    df_with_region = df_with_region.dropna(subset=['Region'])
+    source_columns = [col for col in SOURCE_COLUMNS if cube.has_measure(col)]
+    if not source_columns:
+        return pd.DataFrame()
+    
+    if country is not None:
+        result = cube.country_rows(country, measures=source_columns)
+        if year is not None:
+            result = result[result['Year'] == year].reset_index(drop=True)
+        return result[['Year'] + source_columns]
     
-    aggregated = df_with_region.groupby('Region')[column].sum().reset_index()
-    return aggregated
+    rollup = _get_rollup(dataset)
+    start_year, end_year = (rollup.years[0], rollup.years[-1]) if year is None else (year, year)
+    
+    return pd.DataFrame({
+        'Source': source_columns,
+        'Emissions': rollup.range_total(source_columns, start_year, end_year).sum(axis=0)
+    })
+
+def _get_rank_index(dataset, metric):
+    try:
+        return get_dataset_store().rank_index(dataset, metric)
+    except KeyError:
+        return None
 
-@st.cache_data
-def aggregate_by_source(df, year=None, country=None):
-    if df.empty:
+@dataset_cache
+def get_top_emitters(dataset='emissions', column='Total', year=None, n=10):
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column):
         return pd.DataFrame()
     
-    source_columns = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
+    if year is None:
+        # Global and International Transport are left out, as they are when ranking a single year.
+        country_positions, year_positions = cube.top(column, year=year, n=n, countries=rankable_countries(cube))
+        return cube.rows(country_positions, year_positions)
     
-    source_columns = [col for col in source_columns if col in df.columns]
-    if not source_columns:
+    year_position = cube.year_position(year)
+    if year_position is None:
         return pd.DataFrame()
     
-    filtered_df = df.copy()
-    if year is not None:
-        filtered_df = filtered_df[filtered_df['Year'] == year]
-    if country is not None:
-        filtered_df = filtered_df[filtered_df['Country'] == country]
+    country_positions = _get_rank_index(dataset, column).top(year_position, n)
+    return cube.rows(country_positions, np.full(len(country_positions), year_position))
+
+@dataset_cache
+def get_bottom_emitters(dataset='emissions', column='Total', year=None, n=10):
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column) or year is None:
+        return pd.DataFrame()
     
-    if country is not None:
-        result = filtered_df[['Year'] + source_columns]
-    else:
-        result = pd.DataFrame({
-            'Source': source_columns,
-            'Emissions': [filtered_df[col].sum() for col in source_columns]
-        })
+    year_position = cube.year_position(year)
+    if year_position is None:
+        return pd.DataFrame()
+    
+    # Countries reporting zero (mostly dissolved or uninhabited territories) are not emitters.
+    rank_index = _get_rank_index(dataset, column)
+    country_positions = rank_index.bottom(year_position, n, eligible=rank_index.values[:, year_position] > 0)
+    return cube.rows(country_positions, np.full(len(country_positions), year_position))
+
+@dataset_cache
+def get_top_by_metric(dataset='emissions', metric='Total', year=None, n=10, min_total=None):
+    # Ranks by any indexed metric, including derived "<source>_intensity" shares of Total.
+    cube = _get_cube(dataset)
+    rank_index = _get_rank_index(dataset, metric) if cube is not None else None
+    year_position = cube.year_position(year) if rank_index is not None and year is not None else None
+    if year_position is None:
+        return pd.DataFrame()
     
+    eligible = None
+    if min_total is not None:
+        eligible = cube.year_slice(year)[:, cube.measure_index['Total']] >= min_total
+    
+    country_positions = rank_index.top(year_position, n, eligible=eligible)
+    
+    result = cube.rows(country_positions, np.full(len(country_positions), year_position))
+    if metric not in result.columns:
+        result[metric] = rank_index.values[country_positions, year_position]
     return result
 
-@st.cache_data
-def calculate_per_source_percentages(df, year=None):
-    if df.empty:
+def get_country_rank(dataset='emissions', column='Total', country=None, year=None):
+    cube = _get_cube(dataset)
+    if cube is None or country not in cube.country_index or year is None:
+        return None
+    
+    year_position = cube.year_position(year)
+    rank_index = _get_rank_index(dataset, column)
+    if year_position is None or rank_index is None:
+        return None
+    
+    return rank_index.rank_of(cube.country_index[country], year_position)
+
+@dataset_cache
+def get_rank_trajectories(dataset='emissions', column='Total', countries=None, start_year=None, end_year=None):
+    cube = _get_cube(dataset)
+    rank_index = _get_rank_index(dataset, column) if cube is not None else None
+    if rank_index is None or not countries:
         return pd.DataFrame()
     
-    source_columns = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
+    positions = [cube.country_index[c] for c in countries if c in cube.country_index]
+    start, stop = cube.year_bounds(
+        cube.years[0] if start_year is None else start_year,
+        cube.years[-1] if end_year is None else end_year
+    )
+    ranks = rank_index.trajectories(positions, start, stop).astype(float)
+    ranks[ranks == 0] = np.nan
     
-    source_columns = [col for col in source_columns if col in df.columns]
+    years = cube.years[start:stop]
+    return pd.DataFrame({
+        'Country': np.repeat(np.asarray(cube.countries, dtype=object)[positions], len(years)),
+        'Year': np.tile(years, len(positions)),
+        'Rank': ranks.ravel()
+    })
+
+@dataset_cache
+def calculate_per_source_percentages(dataset='emissions', year=None):
+    rollup = _get_rollup(dataset)
+    if rollup is None:
+        return pd.DataFrame()
+    
+    source_columns = [col for col in SOURCE_COLUMNS if rollup.has_measure(col)]
     if not source_columns:
         return pd.DataFrame()
     
-    if year is not None:
-        df = df[df['Year'] == year]
+    start_year, end_year = (rollup.years[0], rollup.years[-1]) if year is None else (year, year)
+    years, totals = rollup.global_series(source_columns, start_year, end_year)
     
-    sources_by_year = df.groupby('Year')[source_columns].sum().reset_index()
+    sources_by_year = pd.DataFrame(totals, columns=source_columns)
+    sources_by_year.insert(0, 'Year', years)
     
     for source in source_columns:
         sources_by_year[f"{source}_pct"] = (sources_by_year[source] / sources_by_year[source_columns].sum(axis=1)) * 100
     
     return sources_by_year
 
-@st.cache_data
-def get_top_emitters(df, column='Total', year=None, n=10):
-    if df.empty or column not in df.columns:
+@dataset_cache
+def calculate_growth_rates(dataset='emissions', column='Total', periods=[5, 10, 20], year=None):
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column):
+        return pd.DataFrame()
+    
+    year_position = len(cube.years) - 1 if year is None else cube.year_position(year)
+    if year_position is None:
         return pd.DataFrame()
     
-    if year is not None:
-        df = df[df['Year'] == year]
+    growth = cube.growth_at(column, year_position, list(periods))
     
-    top_n = df.sort_values(column, ascending=False).head(n)
-    return top_n
+    result = pd.DataFrame(growth, columns=[f'{period}yr_growth' for period in periods])
+    result.insert(0, 'Country', cube.countries)
+    return result
 
-@st.cache_data
-def calculate_growth_rates(df, column='Total', periods=[5, 10, 20]):
-    if df.empty or column not in df.columns:
+@dataset_cache
+def calculate_growth_matrix(dataset='emissions', column='Total', period=1):
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column):
         return pd.DataFrame()
     
-    latest_year = df['Year'].max()
+    growth = cube.growth(column, period)
     
-    result = pd.DataFrame({'Country': df['Country'].unique()})
+    matrix = pd.DataFrame(growth, index=pd.Index(cube.countries, name='Country'), columns=cube.years)
+    return matrix.iloc[:, period:]
+
+@cached(version_of=get_dataset_version, max_entries=32)
+def get_year_data(dataset='emissions', year=None):
+    cube = _get_cube(dataset)
+    if cube is None or year is None:
+        return pd.DataFrame()
+    
+    return cube.year_rows(year)
+
+@cached(version_of=get_dataset_version, max_entries=64)
+def get_country_data(dataset='emissions', country=None):
+    cube = _get_cube(dataset)
+    if cube is None or country is None:
+        return pd.DataFrame()
+    
+    return cube.country_rows(country)
+
+@cached(version_of=get_dataset_version, max_entries=32)
+def get_countries_data(dataset='emissions', countries=None):
+    cube = _get_cube(dataset)
+    if cube is None or not countries:
+        return pd.DataFrame()
+    
+    return cube.countries_rows(countries)
+
+@cached(version_of=get_dataset_version, max_entries=16)
+def get_year_matrix(dataset='emissions', column='Total', start_year=None, end_year=None):
+    # Countries x years for maps: non-country rows (config.NON_COUNTRY_ISO_CODES) and rows without an ISO code are dropped.
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column):
+        return pd.DataFrame()
+    
+    start, stop = cube.year_bounds(
+        cube.years[0] if start_year is None else start_year,
+        cube.years[-1] if end_year is None else end_year
+    )
+    mappable = np.array([isinstance(code, str) and code not in config.NON_COUNTRY_ISO_CODES for code in cube.iso_codes])
+    
+    index = pd.MultiIndex.from_arrays(
+        [cube.iso_codes[mappable], np.asarray(cube.countries, dtype=object)[mappable]],
+        names=['ISO 3166-1 alpha-3', 'Country']
+    )
+    return pd.DataFrame(cube.measure_slice(column)[mappable, start:stop], index=index, columns=cube.years[start:stop])
+
+def get_country_year_pairs(x_dataset='emissions', y_dataset='per_capita', column='Total', suffixes=('_x', '_y')):
+    # Every mappable country-year with a value in both datasets, ordered by country then year.
+    # Not cached itself: both year matrices are, and stacking them is cheap.
+    x_matrix = get_year_matrix(x_dataset, column)
+    y_matrix = get_year_matrix(y_dataset, column)
+    if x_matrix.empty or y_matrix.empty:
+        return pd.DataFrame()
+    
+    x_matrix, y_matrix = x_matrix.align(y_matrix, join='inner')
+    x_values = x_matrix.to_numpy(dtype=np.float64)
+    y_values = y_matrix.to_numpy(dtype=np.float64)
+    
+    present = np.isfinite(x_values) & np.isfinite(y_values)
+    rows, cols = np.nonzero(present)
+    
+    return pd.DataFrame({
+        'Country': x_matrix.index.get_level_values('Country')[rows],
+        'Year': x_matrix.columns.to_numpy()[cols],
+        f"{column}{suffixes[0]}": x_values[present],
+        f"{column}{suffixes[1]}": y_values[present]
+    })
+
+@dataset_cache
+def aggregate_by_year_range(dataset='emissions', columns='Total', start_year=None, end_year=None):
+    # Global totals come from the rollup, so the Global/WLD row is never added on top of countries.
+    rollup = _get_rollup(dataset)
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    if rollup is None or not columns or not all(rollup.has_measure(col) for col in columns):
+        return pd.DataFrame()
+    
+    start_year = rollup.years[0] if start_year is None else start_year
+    end_year = rollup.years[-1] if end_year is None else end_year
+    
+    years, totals = rollup.global_series(columns, start_year, end_year)
+    result = pd.DataFrame(totals, columns=columns)
+    result.insert(0, 'Year', years)
+    return result
+
+@dataset_cache
+def range_total_by_country(dataset='emissions', column='Total', start_year=None, end_year=None):
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column):
+        return pd.DataFrame()
+    
+    start_year = cube.years[0] if start_year is None else start_year
+    end_year = cube.years[-1] if end_year is None else end_year
+    
+    return pd.DataFrame({
+        'Country': cube.countries,
+        'ISO 3166-1 alpha-3': cube.iso_codes,
+        column: cube.range_totals(column, start_year, end_year)
+    })
+
+@dataset_cache
+def range_mean_by_country(dataset='emissions', column='Total', start_year=None, end_year=None):
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column):
+        return pd.DataFrame()
+    
+    start_year = cube.years[0] if start_year is None else start_year
+    end_year = cube.years[-1] if end_year is None else end_year
+    
+    return pd.DataFrame({
+        'Country': cube.countries,
+        'ISO 3166-1 alpha-3': cube.iso_codes,
+        column: cube.range_means(column, start_year, end_year)
+    })
+
+@dataset_cache
+def range_total_by_source(dataset='emissions', start_year=None, end_year=None, country=None):
+    cube = _get_cube(dataset)
+    if cube is None:
+        return pd.DataFrame()
+    
+    source_columns = [col for col in SOURCE_COLUMNS if cube.has_measure(col)]
+    if not source_columns:
+        return pd.DataFrame()
+    
+    start_year = cube.years[0] if start_year is None else start_year
+    end_year = cube.years[-1] if end_year is None else end_year
+    
+    if country is None:
+        emissions = _get_rollup(dataset).range_total(source_columns, start_year, end_year).sum(axis=0)
+    elif country in cube.country_index:
+        emissions = cube.range_total(source_columns, start_year, end_year, country)
+    else:
+        return pd.DataFrame()
+    
+    return pd.DataFrame({'Source': source_columns, 'Emissions': emissions})
+
+@dataset_cache
+def cumulative_emissions(dataset='emissions', column='Total', countries=None):
+    cube = _get_cube(dataset)
+    if cube is None or not cube.has_measure(column):
+        return pd.DataFrame()
+    
+    if countries is None:
+        return pd.DataFrame({
+            'Year': cube.years,
+            column: _get_rollup(dataset).cumulative_global(column)
+        })
     
-    for period in periods:
-        current_year_data = df[df['Year'] == latest_year][['Country', column]].set_index('Country')
-        past_year_data = df[df['Year'] == (latest_year - period)][['Country', column]].set_index('Country')
-        
-        growth = pd.DataFrame({
-            'Country': current_year_data.index,
-            f'{period}yr_growth': ((current_year_data[column] / past_year_data[column]) - 1) * 100
-        }).set_index('Country')
-        
-        result = result.set_index('Country').join(growth, how='left').reset_index()
+    positions = sorted(cube.country_index[c] for c in countries if c in cube.country_index)
+    cumulative = cube.cumulative(column, positions)
     
-    return result
\ No newline at end of file
+    return pd.DataFrame({
+        'Country': np.repeat(np.asarray(cube.countries, dtype=object)[positions], len(cube.years)),
+        'Year': np.tile(cube.years, len(positions)),
+        column: cumulative.ravel()
+    })
\ No newline at end of file
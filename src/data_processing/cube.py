@@ -0,0 +1,206 @@
+"""
+Dense country x year x measure array built once from a long GCB frame.
+
+Year and country selections become array slices instead of boolean masks over
+the full 63k-row table.
+"""
+
+import numpy as np
+import pandas as pd
+
+COUNTRY_COLUMN = 'Country'
+ISO_COLUMN = 'ISO 3166-1 alpha-3'
+YEAR_COLUMN = 'Year'
+
+class EmissionsCube:
+    def __init__(self, values, present, countries, iso_codes, years, measures):
+        self.values = values
+        self.present = present
+        self.countries = countries
+        self.iso_codes = iso_codes
+        self.years = years
+        self.measures = measures
+        
+        self.country_index = {country: i for i, country in enumerate(countries)}
+        self.iso_index = {code: i for i, code in enumerate(iso_codes) if isinstance(code, str)}
+        self.year_index = {int(year): i for i, year in enumerate(years)}
+        self.measure_index = {measure: i for i, measure in enumerate(measures)}
+        
+        for array in (self.values, self.present):
+            array.flags.writeable = False
+        
+        self._prefix_sums = None
+        self._prefix_counts = None
+    
+    @classmethod
+    def from_frame(cls, df, measures=None):
+        if measures is None:
+            measures = [col for col in df.columns if pd.api.types.is_float_dtype(df[col])]
+        
+        country_codes, countries = pd.factorize(df[COUNTRY_COLUMN], sort=False)
+        first_rows = pd.Series(np.arange(len(df))).groupby(country_codes).first().to_numpy()
+        iso_codes = np.asarray(df[ISO_COLUMN].astype(object).to_numpy()[first_rows], dtype=object)
+        
+        year_values = df[YEAR_COLUMN].to_numpy()
+        min_year, max_year = int(year_values.min()), int(year_values.max())
+        years = np.arange(min_year, max_year + 1, dtype=np.int16)
+        year_codes = year_values.astype(np.int64) - min_year
+        
+        values = np.full((len(countries), len(years), len(measures)), np.nan, dtype=np.float32)
+        values[country_codes, year_codes, :] = df[measures].to_numpy(dtype=np.float32, na_value=np.nan)
+        
+        present = np.zeros((len(countries), len(years)), dtype=bool)
+        present[country_codes, year_codes] = True
+        
+        return cls(values, present, list(countries), iso_codes, years, list(measures))
+    
+    @property
+    def shape(self):
+        return self.values.shape
+    
+    def has_measure(self, measure):
+        return measure in self.measure_index
+    
+    def year_position(self, year):
+        return self.year_index.get(int(year))
+    
+    def measure_slice(self, measure):
+        # (countries, years)
+        return self.values[:, :, self.measure_index[measure]]
+    
+    def year_slice(self, year):
+        # (countries, measures)
+        return self.values[:, self.year_index[int(year)], :]
+    
+    def country_slice(self, country):
+        # (years, measures)
+        return self.values[self.country_index[country], :, :]
+    
+    @property
+    def prefix_sums(self):
+        # (countries, years + 1, measures); entry [:, i] is the sum of years[:i].
+        if self._prefix_sums is None:
+            n_countries, _, n_measures = self.values.shape
+            sums = np.zeros((n_countries, len(self.years) + 1, n_measures), dtype=np.float64)
+            np.nancumsum(self.values, axis=1, dtype=np.float64, out=sums[:, 1:, :])
+            sums.flags.writeable = False
+            self._prefix_sums = sums
+        return self._prefix_sums
+    
+    @property
+    def prefix_counts(self):
+        # Number of non-missing values per cell prefix, used for range means.
+        if self._prefix_counts is None:
+            n_countries, _, n_measures = self.values.shape
+            counts = np.zeros((n_countries, len(self.years) + 1, n_measures), dtype=np.int32)
+            np.cumsum(~np.isnan(self.values), axis=1, dtype=np.int32, out=counts[:, 1:, :])
+            counts.flags.writeable = False
+            self._prefix_counts = counts
+        return self._prefix_counts
+    
+    def year_bounds(self, start_year, end_year):
+        # Clamped half-open [start, stop) positions on the year axis.
+        first_year = int(self.years[0])
+        start = min(max(int(start_year) - first_year, 0), len(self.years))
+        stop = min(max(int(end_year) - first_year + 1, start), len(self.years))
+        return start, stop
+    
+    def range_total(self, measures, start_year, end_year, country):
+        # Sum over [start_year, end_year] for one country in constant time.
+        start, stop = self.year_bounds(start_year, end_year)
+        positions = [self.measure_index[m] for m in measures]
+        sums = self.prefix_sums[self.country_index[country]]
+        return sums[stop, positions] - sums[start, positions]
+    
+    def range_totals(self, measure, start_year, end_year):
+        # Per-country sums over [start_year, end_year] in O(countries).
+        start, stop = self.year_bounds(start_year, end_year)
+        sums = self.prefix_sums[:, :, self.measure_index[measure]]
+        return sums[:, stop] - sums[:, start]
+    
+    def range_means(self, measure, start_year, end_year):
+        start, stop = self.year_bounds(start_year, end_year)
+        position = self.measure_index[measure]
+        counts = self.prefix_counts[:, stop, position] - self.prefix_counts[:, start, position]
+        totals = self.range_totals(measure, start_year, end_year)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, totals / counts, np.nan)
+    
+    def cumulative(self, measure, country_positions=None):
+        # (countries, years) running totals from the first year.
+        sums = self.prefix_sums[:, 1:, self.measure_index[measure]]
+        return sums if country_positions is None else sums[country_positions]
+    
+    def growth(self, measure, period=1):
+        # (countries, years) percentage change against `period` years earlier; NaN where
+        # the earlier year is outside the data.
+        values = self.measure_slice(measure).astype(np.float64)
+        result = np.full(values.shape, np.nan)
+        if 0 < period < values.shape[1]:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result[:, period:] = (values[:, period:] / values[:, :-period] - 1) * 100
+        return result
+    
+    def growth_at(self, measure, year_position, periods):
+        # (countries, periods) growth into one year for several look-back periods at once.
+        values = self.measure_slice(measure).astype(np.float64)
+        periods = np.asarray(periods, dtype=np.int64)
+        past_positions = year_position - periods
+        valid = (periods > 0) & (past_positions >= 0)
+        
+        past = np.full((values.shape[0], len(periods)), np.nan)
+        past[:, valid] = values[:, past_positions[valid]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (values[:, [year_position]] / past - 1) * 100
+    
+    def rows(self, country_positions, year_positions, measures=None):
+        # Rebuilds long-format rows (Country, ISO, Year, measures...) for the given cells.
+        measures = self.measures if measures is None else measures
+        country_positions = np.asarray(country_positions, dtype=np.intp)
+        year_positions = np.asarray(year_positions, dtype=np.intp)
+        
+        data = {
+            COUNTRY_COLUMN: np.asarray(self.countries, dtype=object)[country_positions],
+            ISO_COLUMN: self.iso_codes[country_positions],
+            YEAR_COLUMN: self.years[year_positions]
+        }
+        for measure in measures:
+            data[measure] = self.values[country_positions, year_positions, self.measure_index[measure]]
+        
+        return pd.DataFrame(data)
+    
+    def year_rows(self, year, measures=None):
+        year_pos = self.year_index.get(int(year))
+        if year_pos is None:
+            return self.rows([], [], measures)
+        
+        country_positions = np.flatnonzero(self.present[:, year_pos])
+        return self.rows(country_positions, np.full(len(country_positions), year_pos), measures)
+    
+    def country_rows(self, country, measures=None):
+        return self.countries_rows([country], measures)
+    
+    def countries_rows(self, countries, measures=None):
+        positions = sorted(self.country_index[c] for c in countries if c in self.country_index)
+        country_positions, year_positions = np.nonzero(self.present[positions])
+        
+        return self.rows(np.asarray(positions, dtype=np.intp)[country_positions], year_positions, measures)
+    
+    def top(self, measure, year=None, n=10, countries=None):
+        # countries is an optional boolean mask over country positions to rank.
+        values = self.measure_slice(measure)
+        present = self.present if countries is None else self.present & countries[:, None]
+        if year is not None:
+            year_pos = self.year_index.get(int(year))
+            if year_pos is None:
+                return np.array([], dtype=np.intp), np.array([], dtype=np.intp)
+            country_positions = np.flatnonzero(present[:, year_pos])
+            year_positions = np.full(len(country_positions), year_pos)
+        else:
+            country_positions, year_positions = np.nonzero(present)
+        
+        selected = values[country_positions, year_positions]
+        # Descending with NaN last, matching DataFrame.sort_values(ascending=False).
+        order = np.argsort(np.where(np.isnan(selected), np.inf, -selected), kind='stable')[:n]
+        
+        return country_positions[order], year_positions[order]
\ No newline at end of file
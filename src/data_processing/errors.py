@@ -0,0 +1,20 @@
+"""
+Errors raised while loading the GCB datasets. The data layer never reports to a UI itself;
+the dataset store keeps the error for each failed load and front ends decide how to show it.
+"""
+
+class DataError(Exception):
+    pass
+
+class DataFileNotFoundError(DataError):
+    def __init__(self, path):
+        super().__init__(f"Data file not found at {path}")
+        self.path = path
+
+class MissingColumnError(DataError):
+    def __init__(self, column):
+        super().__init__(f"Required column '{column}' not found in data")
+        self.column = column
+
+class DataLoadError(DataError):
+    pass
\ No newline at end of file
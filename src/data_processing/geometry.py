@@ -0,0 +1,94 @@
+"""
+Bundled world geometry (config.WORLD_GEOMETRY_FILE), decoded from TopoJSON into the
+GeoJSON FeatureCollections Plotly choropleths take, one per level of detail.
+"""
+
+import os
+import json
+import logging
+import functools
+import numpy as np
+import config
+
+logger = logging.getLogger(__name__)
+
+def has_world_geometry():
+    return os.path.exists(config.WORLD_GEOMETRY_FILE)
+
+@functools.lru_cache(maxsize=None)
+def _load_topology():
+    with open(config.WORLD_GEOMETRY_FILE) as f:
+        topology = json.load(f)
+    logger.info("Loaded world geometry from %s (levels: %s)", config.WORLD_GEOMETRY_FILE, ", ".join(topology['objects']))
+    return topology
+
+def _decoded_arc(arc, scale, translate, decimals):
+    # Arcs are delta-encoded integer grid positions. Points that round onto their predecessor are dropped.
+    points = np.round(np.cumsum(np.asarray(arc), axis=0) * scale + translate, decimals)
+    distinct = np.r_[True, (np.diff(points, axis=0) != 0).any(axis=1)]
+    return points[distinct].tolist()
+
+@functools.lru_cache(maxsize=None)
+def _decoded_arcs(decimals):
+    topology = _load_topology()
+    scale = np.asarray(topology['transform']['scale'])
+    translate = np.asarray(topology['transform']['translate'])
+    return [_decoded_arc(arc, scale, translate, decimals) for arc in topology['arcs']]
+
+def _ring(arc_refs, arcs):
+    ring = []
+    for ref in arc_refs:
+        points = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        # Consecutive arcs share their joining point.
+        ring.extend(points if not ring else points[1:])
+    return ring
+
+def _geometry(geometry, arcs):
+    if geometry['type'] == 'Polygon':
+        coordinates = [_ring(ring, arcs) for ring in geometry['arcs']]
+    else:
+        coordinates = [[_ring(ring, arcs) for ring in polygon] for polygon in geometry['arcs']]
+    return {'type': geometry['type'], 'coordinates': coordinates}
+
+def get_geometry_levels():
+    return list(_load_topology()['objects'])
+
+@functools.lru_cache(maxsize=None)
+def _features(level):
+    topology = _load_topology()
+    if level not in topology['objects']:
+        raise KeyError(f"Unknown geometry level '{level}'")
+    
+    arcs = _decoded_arcs(config.MAP_GEOMETRY_DECIMALS.get(level, 2))
+    return tuple({
+        'type': 'Feature',
+        'id': geometry['id'],
+        'properties': {'name': geometry['properties']['name']},
+        'geometry': _geometry(geometry, arcs)
+    } for geometry in topology['objects'][level]['geometries'])
+
+def get_world_geojson(level, ids=None):
+    # Features are shared between calls; treat them as read-only. Pass ids to ship only the
+    # countries a trace actually draws.
+    features = _features(level)
+    if ids is not None:
+        ids = set(ids)
+        features = [feature for feature in features if feature['id'] in ids]
+    return {'type': 'FeatureCollection', 'features': list(features)}
+
+@functools.lru_cache(maxsize=None)
+def get_geometry_ids():
+    return tuple(geometry['id'] for geometry in next(iter(_load_topology()['objects'].values()))['geometries'])
+
+@functools.lru_cache(maxsize=None)
+def _ids_by_name():
+    geometries = next(iter(_load_topology()['objects'].values()))['geometries']
+    return {name: geometry['id'] for geometry in geometries for name in geometry['properties']['names']}
+
+def get_geometry_id(name):
+    # Natural Earth and emissions-file spellings both resolve to the ISO 3166-1 alpha-3 code.
+    return _ids_by_name().get(name)
+
+def get_geometry_level(scope='world'):
+    # Regional scopes are drawn larger, so they get more detail than the whole world.
+    return config.MAP_GEOMETRY_LEVELS.get(scope, config.MAP_GEOMETRY_LEVELS['region'])
\ No newline at end of file
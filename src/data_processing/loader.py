@@ -1,101 +1,203 @@
 import pandas as pd
-import streamlit as st
 import os
 import json
+import hashlib
+import logging
+import functools
+import threading
 import config
+from src.data_processing.schema import apply_schema
+from src.data_processing.store import DatasetStore
+from src.data_processing.errors import DataFileNotFoundError, MissingColumnError, DataLoadError
 
-@st.cache_data
-def load_emissions_data():
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_METADATA_KEY = b"gcb_source_signature"
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_cache_path(csv_path):
+    return os.path.splitext(csv_path)[0] + config.DATA_CACHE_EXTENSION
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _source_signature(csv_path, with_hash=False):
+    stat = os.stat(csv_path)
+    signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        signature['sha256'] = _file_sha256(csv_path)
+    return signature
+
+def _read_cache(cache_path):
+    # Uncompressed Arrow IPC files can be memory-mapped instead of read into Python buffers.
+    with pa.memory_map(cache_path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    signature = json.loads(metadata.get(CACHE_METADATA_KEY, b'{}'))
+    return table, signature
+
+def _write_cache(table, cache_path, signature):
+    metadata = dict(table.schema.metadata or {})
+    metadata[CACHE_METADATA_KEY] = json.dumps(signature).encode()
+    table = table.replace_schema_metadata(metadata)
+    
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
     try:
-        if not os.path.exists(config.TOTAL_EMISSIONS_FILE):
-            st.error(f"Error: Data file not found at {config.TOTAL_EMISSIONS_FILE}")
-            return pd.DataFrame()
-        
-        df = pd.read_csv(config.TOTAL_EMISSIONS_FILE)
-        
-        required_columns = ['Country', 'ISO 3166-1 alpha-3', 'Year', 'Total']
-        for col in required_columns:
-            if col not in df.columns:
-                st.error(f"Error: Required column '{col}' not found in data")
-                return pd.DataFrame()
-        
-        df['Year'] = df['Year'].astype(int)
-        
-        return df
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def get_source_version(csv_path):
+    if not os.path.exists(csv_path):
+        return None
     
-    except Exception as e:
-        st.error(f"Error loading emissions data: {str(e)}")
-        return pd.DataFrame()
+    signature = _source_signature(csv_path)
+    token = f"{os.path.abspath(csv_path)}:{signature['size']}:{signature['mtime_ns']}"
+    return hashlib.sha1(token.encode()).hexdigest()[:12]
 
-@st.cache_data
-def load_per_capita_data():
+def parse_csv(csv_path):
+    if pa is None or not config.DATA_CSV_ARROW_READER:
+        return pd.read_csv(csv_path)
+    
+    # Arrow's reader parses blocks on its own thread pool and releases the GIL, so datasets
+    # loading side by side do not serialize. Empty strings are missing values, as in pandas.
+    table = pa_csv.read_csv(csv_path, convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    return table.to_pandas()
+
+def read_csv_cached(csv_path):
+    if pa is None or not config.DATA_CACHE_ENABLED:
+        return parse_csv(csv_path)
+    
+    cache_path = get_cache_path(csv_path)
+    signature = _source_signature(csv_path)
+    
+    if os.path.exists(cache_path):
+        try:
+            table, cached_signature = _read_cache(cache_path)
+            
+            if all(cached_signature.get(key) == signature[key] for key in ('size', 'mtime_ns')):
+                return table.to_pandas()
+            
+            # Size or mtime moved (e.g. a fresh checkout); only rebuild if the content did too.
+            signature = _source_signature(csv_path, with_hash=True)
+            if cached_signature.get('sha256') == signature['sha256']:
+                try:
+                    _write_cache(table, cache_path, signature)
+                except OSError as e:
+                    logger.warning("Could not refresh data cache %s: %s", cache_path, e)
+                return table.to_pandas()
+        except (OSError, ValueError, pa.ArrowException) as e:
+            logger.warning("Ignoring unreadable data cache %s: %s", cache_path, e)
+    
+    df = parse_csv(csv_path)
+    
+    if 'sha256' not in signature:
+        signature = _source_signature(csv_path, with_hash=True)
     try:
-        if not os.path.exists(config.PER_CAPITA_EMISSIONS_FILE):
-            st.error(f"Error: Data file not found at {config.PER_CAPITA_EMISSIONS_FILE}")
-            return pd.DataFrame()
-        
-        df = pd.read_csv(config.PER_CAPITA_EMISSIONS_FILE)
-        
-        required_columns = ['Country', 'ISO 3166-1 alpha-3', 'Year', 'Total']
-        for col in required_columns:
-            if col not in df.columns:
-                st.error(f"Error: Required column '{col}' not found in data")
-                return pd.DataFrame()
-        
-        df['Year'] = df['Year'].astype(int)
-        
-        return df
+        _write_cache(pa.Table.from_pandas(df, preserve_index=False), cache_path, signature)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning("Could not write data cache %s: %s", cache_path, e)
     
-    except Exception as e:
-        st.error(f"Error loading per capita data: {str(e)}")
-        return pd.DataFrame()
+    return df
 
-@st.cache_data
-def load_sources_data():
+def _read_dataset(name, csv_path, required_columns, metadata_file=None):
+    if not os.path.exists(csv_path):
+        raise DataFileNotFoundError(csv_path)
+    
     try:
-        if not os.path.exists(config.SOURCES_FILE):
-            st.error(f"Error: Data file not found at {config.SOURCES_FILE}")
-            return pd.DataFrame()
-        
-        df = pd.read_csv(config.SOURCES_FILE)
-        
-        required_columns = ['Country', 'ISO 3166-1 alpha-3', 'Year']
-        for col in required_columns:
-            if col not in df.columns:
-                st.error(f"Error: Required column '{col}' not found in data")
-                return pd.DataFrame()
-        
-        df['Year'] = df['Year'].astype(int)
-        
-        return df
+        df = read_csv_cached(csv_path)
+    except Exception as e:
+        raise DataLoadError(f"Could not read {csv_path}: {e}") from e
+    
+    for col in required_columns:
+        if col not in df.columns:
+            raise MissingColumnError(col)
     
+    metadata = load_metadata(metadata_file) if metadata_file else None
+    try:
+        return apply_schema(df, metadata, name=name)
     except Exception as e:
-        st.error(f"Error loading sources data: {str(e)}")
-        return pd.DataFrame()
+        raise DataLoadError(f"Could not prepare {name} data: {e}") from e
 
-@st.cache_data
-def load_metadata(metadata_file):
+def _read_emissions_data():
+    return _read_dataset('emissions', config.TOTAL_EMISSIONS_FILE, ['Country', 'ISO 3166-1 alpha-3', 'Year', 'Total'], config.TOTAL_EMISSIONS_METADATA)
+
+def _read_per_capita_data():
+    return _read_dataset('per_capita', config.PER_CAPITA_EMISSIONS_FILE, ['Country', 'ISO 3166-1 alpha-3', 'Year', 'Total'], config.PER_CAPITA_METADATA)
+
+def _read_sources_data():
+    return _read_dataset('sources', config.SOURCES_FILE, ['Country', 'ISO 3166-1 alpha-3', 'Year'])
+
+def get_dataset_store():
+    # One store per process, shared by every session and by non-Streamlit callers. The lock
+    # keeps two first callers from each building a store and loading every dataset twice.
+    global _store
+    if _store is not None:
+        return _store
+    
+    with _store_lock:
+        if _store is None:
+            store = DatasetStore({
+                'emissions': lambda: (_read_emissions_data(), get_source_version(config.TOTAL_EMISSIONS_FILE)),
+                'per_capita': lambda: (_read_per_capita_data(), get_source_version(config.PER_CAPITA_EMISSIONS_FILE)),
+                'sources': lambda: (_read_sources_data(), get_source_version(config.SOURCES_FILE))
+            })
+            if config.DATASET_PRELOAD:
+                # The first page waits for the slowest file rather than loading each one as it is touched.
+                store.preload()
+            _store = store
+    
+    return _store
+
+def get_dataset_version(name):
+    return get_dataset_store().version(name)
+
+def load_emissions_data():
+    return get_dataset_store().view('emissions')
+
+def load_per_capita_data():
+    return get_dataset_store().view('per_capita')
+
+def load_sources_data():
+    return get_dataset_store().view('sources')
+
+@functools.lru_cache(maxsize=None)
+def _read_metadata(metadata_file):
+    if not os.path.exists(metadata_file):
+        logger.warning("Metadata file not found at %s", metadata_file)
+        return {}
+    
     try:
-        if not os.path.exists(metadata_file):
-            st.warning(f"Metadata file not found at {metadata_file}")
-            return {}
-        
         with open(metadata_file, 'r') as f:
-            metadata = json.load(f)
-        
-        return metadata
-    
-    except Exception as e:
-        st.warning(f"Error loading metadata: {str(e)}")
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Error loading metadata %s: %s", metadata_file, e)
         return {}
 
+def load_metadata(metadata_file):
+    return dict(_read_metadata(metadata_file))
+
+def get_dataset_error(name):
+    return get_dataset_store().error(name)
+
 def get_country_codes():
-    df = load_emissions_data()
-    if df.empty:
-        return {}
-    
-    country_codes = dict(zip(df['Country'], df['ISO 3166-1 alpha-3']))
-    return country_codes
+    return dict(get_dataset_store().country_codes('emissions'))
 
 def get_countries_by_region():
     country_codes = get_country_codes()
@@ -0,0 +1,72 @@
+"""
+Per-year rank index over one metric of an EmissionsCube.
+
+Countries are sorted once per year (descending, missing values last), so top-N,
+bottom-N and "rank of X in year Y" become lookups. Rows that are not countries
+(config.NON_COUNTRY_ISO_CODES: Global and International Transport) are never ranked.
+"""
+
+import numpy as np
+import config
+
+INTENSITY_SUFFIX = '_intensity'
+
+def metric_values(cube, metric):
+    # (countries, years) values for a stored measure or a derived "<source>_intensity".
+    if cube.has_measure(metric):
+        return cube.measure_slice(metric).astype(np.float64)
+    
+    if metric.endswith(INTENSITY_SUFFIX):
+        source = metric[:-len(INTENSITY_SUFFIX)]
+        if cube.has_measure(source) and cube.has_measure('Total'):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return cube.measure_slice(source).astype(np.float64) / cube.measure_slice('Total') * 100
+    
+    raise KeyError(f"Unknown metric '{metric}'")
+
+def rankable_countries(cube):
+    return np.array([code not in config.NON_COUNTRY_ISO_CODES for code in cube.iso_codes], dtype=bool)
+
+class RankIndex:
+    def __init__(self, values, rankable):
+        values = np.where(np.isfinite(values) & rankable[:, None], values, np.nan)
+        n_countries, n_years = values.shape
+        
+        # order[y] lists country positions from largest to smallest; unranked countries trail.
+        sort_keys = np.where(np.isnan(values), np.inf, -values).T
+        self.order = np.argsort(sort_keys, axis=1, kind='stable').astype(np.int32)
+        self.counts = (~np.isnan(values)).sum(axis=0)
+        
+        ranks = np.zeros((n_years, n_countries), dtype=np.int32)
+        np.put_along_axis(ranks, self.order, np.arange(1, n_countries + 1, dtype=np.int32)[None, :], axis=1)
+        ranks[ranks > self.counts[:, None]] = 0
+        # (countries, years), 1-based; 0 means not ranked that year.
+        self.ranks = ranks.T.copy()
+        self.values = values
+        
+        for array in (self.order, self.counts, self.ranks, self.values):
+            array.flags.writeable = False
+    
+    @classmethod
+    def from_cube(cls, cube, metric):
+        return cls(metric_values(cube, metric), rankable_countries(cube))
+    
+    def top(self, year_position, n, eligible=None):
+        order = self.order[year_position, :self.counts[year_position]]
+        if eligible is not None:
+            order = order[eligible[order]]
+        return order[:n]
+    
+    def bottom(self, year_position, n, eligible=None):
+        order = self.order[year_position, :self.counts[year_position]]
+        if eligible is not None:
+            order = order[eligible[order]]
+        return order[::-1][:n]
+    
+    def rank_of(self, country_position, year_position):
+        rank = int(self.ranks[country_position, year_position])
+        return rank or None
+    
+    def trajectories(self, country_positions, start=0, stop=None):
+        # (countries, years) ranks for bump charts.
+        return self.ranks[country_positions, start:stop]
\ No newline at end of file
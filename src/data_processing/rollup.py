@@ -0,0 +1,77 @@
+"""
+Year x region x measure rollup computed once from an EmissionsCube.
+
+Aggregate pseudo-countries (config.AGGREGATE_ISO_CODES, e.g. Global/WLD) are left
+out so they are never summed together with the countries they already contain;
+International Transport is kept as its own group. Every country ends up in exactly
+one group, so the global total is the sum over all groups.
+"""
+
+import numpy as np
+import config
+
+class RegionRollup:
+    def __init__(self, totals, groups, years, measures):
+        self.totals = totals
+        self.groups = groups
+        self.years = years
+        self.measures = measures
+        
+        self.group_index = {group: i for i, group in enumerate(groups)}
+        self.measure_index = {measure: i for i, measure in enumerate(measures)}
+        
+        prefix = np.zeros((len(years) + 1,) + totals.shape[1:], dtype=np.float64)
+        np.cumsum(totals, axis=0, out=prefix[1:])
+        
+        self.prefix = prefix
+        self.global_totals = totals.sum(axis=1)
+        for array in (self.totals, self.prefix, self.global_totals):
+            array.flags.writeable = False
+    
+    @classmethod
+    def from_cube(cls, cube, regions=None):
+        regions = config.REGIONS if regions is None else regions
+        
+        groups = list(regions) + [config.ROLLUP_OTHER_LABEL, config.ROLLUP_TRANSPORT_LABEL]
+        group_of_iso = {code: i for i, region in enumerate(regions) for code in regions[region]}
+        group_of_iso[config.INTERNATIONAL_TRANSPORT_ISO] = len(groups) - 1
+        
+        membership = np.zeros((len(groups), len(cube.countries)), dtype=np.float64)
+        for position, code in enumerate(cube.iso_codes):
+            if code in config.AGGREGATE_ISO_CODES:
+                continue
+            membership[group_of_iso.get(code, len(groups) - 2), position] = 1.0
+        
+        values = np.nan_to_num(cube.values.astype(np.float64), nan=0.0)
+        totals = np.einsum('gc,cym->ygm', membership, values)
+        
+        return cls(totals, groups, cube.years, list(cube.measures))
+    
+    @property
+    def regions(self):
+        return self.groups[:-2]
+    
+    def has_measure(self, measure):
+        return measure in self.measure_index
+    
+    def year_bounds(self, start_year, end_year):
+        first_year = int(self.years[0])
+        start = min(max(int(start_year) - first_year, 0), len(self.years))
+        stop = min(max(int(end_year) - first_year + 1, start), len(self.years))
+        return start, stop
+    
+    def global_series(self, measures, start_year, end_year):
+        start, stop = self.year_bounds(start_year, end_year)
+        positions = [self.measure_index[m] for m in measures]
+        return self.years[start:stop], self.global_totals[start:stop][:, positions]
+    
+    def range_total(self, measures, start_year, end_year, groups=None):
+        # (groups, measures) sums over [start_year, end_year] from the prefix table.
+        start, stop = self.year_bounds(start_year, end_year)
+        positions = [self.measure_index[m] for m in measures]
+        group_positions = range(len(self.groups)) if groups is None else [self.group_index[g] for g in groups]
+        window = self.prefix[stop] - self.prefix[start]
+        return window[np.ix_(list(group_positions), positions)]
+    
+    def cumulative_global(self, measure):
+        return self.prefix[1:, :, self.measure_index[measure]].sum(axis=1)
\ No newline at end of file
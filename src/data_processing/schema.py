@@ -0,0 +1,73 @@
+"""
+Compact dtypes for the loaded GCB frames, driven by the *_metadata.json field definitions.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+import config
+
+logger = logging.getLogger(__name__)
+
+_memory_report = {}
+
+def get_field_types(metadata):
+    return {field['name']: field.get('type') for field in metadata.get('fields', [])}
+
+def memory_footprint(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def _compact_float(series):
+    # float32 keeps about 7 significant digits, more than charts show (FIGURE_SIGNIFICANT_DIGITS)
+    # and what the cube stores anyway; sums are accumulated in float64 downstream. Mostly-missing
+    # columns are stored sparse, holding only their present values.
+    values = series.astype(np.float32)
+    if values.isna().mean() >= config.SPARSE_MIN_MISSING_FRACTION:
+        return values.astype(pd.SparseDtype(np.float32, np.nan))
+    return values
+
+def _compact_column(series, field_type):
+    if series.name in config.INTEGER_COLUMNS:
+        return series.astype(config.INTEGER_COLUMNS[series.name])
+    
+    if field_type == 'string':
+        return series.astype('category')
+    
+    if field_type == 'number' or (field_type is None and pd.api.types.is_float_dtype(series)):
+        return _compact_float(series)
+    
+    if field_type is None and (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        # Without metadata, low-cardinality text (e.g. the provenance labels in the sources file) is categorical.
+        if series.nunique(dropna=True) <= len(series) // 2:
+            return series.astype('category')
+    
+    return series
+
+def apply_schema(df, metadata=None, name=None):
+    if df.empty:
+        return df
+    
+    field_types = get_field_types(metadata or {})
+    before = memory_footprint(df)
+    
+    compact = pd.DataFrame({
+        col: _compact_column(df[col], field_types.get(col)) for col in df.columns
+    }, index=df.index)
+    
+    after = memory_footprint(compact)
+    if name is not None:
+        _memory_report[name] = {'before_bytes': before, 'after_bytes': after}
+    logger.info(
+        "Schema applied to %s: %.2f MB -> %.2f MB (%.1fx smaller)",
+        name or 'frame', before / 1e6, after / 1e6, before / after if after else float('inf')
+    )
+    
+    return compact
+
+def get_memory_report():
+    report = pd.DataFrame.from_dict(_memory_report, orient='index')
+    if report.empty:
+        return report
+    
+    report['reduction'] = report['before_bytes'] / report['after_bytes']
+    return report
\ No newline at end of file
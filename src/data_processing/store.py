@@ -0,0 +1,162 @@
+"""
+Process-wide, read-only store for the loaded GCB datasets.
+
+Frames are loaded once and handed out as shallow views. Copy-on-write makes any
+mutation through a view copy the touched columns first, so the shared data can
+never be changed by a caller.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+import pandas as pd
+from src.data_processing.cube import EmissionsCube
+from src.data_processing.rollup import RegionRollup
+from src.data_processing.ranking import RankIndex
+from src.data_processing.errors import DataError
+
+logger = logging.getLogger(__name__)
+
+if int(pd.__version__.split('.')[0]) < 3:
+    # pandas >= 3 always uses copy-on-write; older versions need it switched on.
+    pd.set_option('mode.copy_on_write', True)
+
+class DatasetStore:
+    def __init__(self, loaders):
+        self._loaders = dict(loaders)
+        self._frames = {}
+        self._versions = {}
+        self._errors = {}
+        self._country_codes = {}
+        self._cubes = {}
+        self._rollups = {}
+        self._rank_indexes = {}
+        self._lock = threading.Lock()
+        # Each dataset loads under its own lock, so datasets can load side by side. Its ready
+        # event is set once a load attempt has finished, successful or not.
+        self._load_locks = {name: threading.Lock() for name in self._loaders}
+        self._ready = {name: threading.Event() for name in self._loaders}
+    
+    @property
+    def names(self):
+        return list(self._loaders)
+    
+    def _ensure_loaded(self, name):
+        if name in self._frames:
+            return
+        
+        if name not in self._loaders:
+            raise KeyError(f"Unknown dataset '{name}'")
+        
+        with self._load_locks[name]:
+            if name in self._frames:
+                return
+            
+            try:
+                self._load(name)
+            finally:
+                self._ready[name].set()
+    
+    def _load(self, name):
+        try:
+            df, version = self._loaders[name]()
+        except DataError as e:
+            # Do not pin a failed load for the life of the process; the next access retries.
+            logger.error("Could not load dataset '%s': %s", name, e)
+            self._errors[name] = e
+            return
+        
+        if df.empty:
+            return
+        
+        self._errors.pop(name, None)
+        self._versions[name] = version
+        if {'Country', 'ISO 3166-1 alpha-3'}.issubset(df.columns):
+            pairs = df[['Country', 'ISO 3166-1 alpha-3']].drop_duplicates('Country')
+            self._country_codes[name] = MappingProxyType(
+                dict(zip(pairs['Country'], pairs['ISO 3166-1 alpha-3']))
+            )
+        # Published last: readers check for the frame without taking the lock.
+        self._frames[name] = df
+    
+    def is_loaded(self, name):
+        return name in self._frames
+    
+    def is_ready(self, name):
+        return self._ready[name].is_set()
+    
+    def preload(self, names=None, max_workers=None):
+        # Starts loading the datasets side by side and returns their futures without waiting.
+        # A caller that needs one of them blocks on that dataset's lock alone.
+        names = [name for name in (names or self.names) if not self.is_loaded(name)]
+        if not names:
+            return []
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers or len(names), thread_name_prefix='dataset-loader')
+        futures = [executor.submit(self._ensure_loaded, name) for name in names]
+        executor.shutdown(wait=False)
+        return futures
+    
+    def wait(self, names=None, timeout=None):
+        # True once every named dataset has finished loading (or failed to) within the timeout.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in names or self.names:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not self._ready[name].wait(remaining):
+                return False
+        return True
+    
+    def error(self, name):
+        # The DataError from the last failed load, or None once the dataset is available.
+        return self._errors.get(name)
+    
+    def view(self, name):
+        self._ensure_loaded(name)
+        if name not in self._frames:
+            return pd.DataFrame()
+        
+        return self._frames[name].copy(deep=False)
+    
+    def version(self, name):
+        self._ensure_loaded(name)
+        return self._versions.get(name)
+    
+    def country_codes(self, name):
+        self._ensure_loaded(name)
+        return self._country_codes.get(name, MappingProxyType({}))
+    
+    def cube(self, name):
+        self._ensure_loaded(name)
+        if name in self._cubes or name not in self._frames:
+            return self._cubes.get(name)
+        
+        with self._lock:
+            if name not in self._cubes:
+                self._cubes[name] = EmissionsCube.from_frame(self._frames[name])
+        
+        return self._cubes[name]
+    
+    def rollup(self, name):
+        cube = self.cube(name)
+        if cube is None or name in self._rollups:
+            return self._rollups.get(name)
+        
+        with self._lock:
+            if name not in self._rollups:
+                self._rollups[name] = RegionRollup.from_cube(cube)
+        
+        return self._rollups[name]
+    
+    def rank_index(self, name, metric):
+        cube = self.cube(name)
+        key = (name, metric)
+        if cube is None or key in self._rank_indexes:
+            return self._rank_indexes.get(key)
+        
+        index = RankIndex.from_cube(cube, metric)
+        with self._lock:
+            self._rank_indexes.setdefault(key, index)
+        
+        return self._rank_indexes[key]
\ No newline at end of file
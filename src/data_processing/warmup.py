@@ -0,0 +1,51 @@
+"""
+Start-up warm-up for the data layer: loads every dataset and builds the cubes, regional
+rollups and rank indexes the pages query, logging how long each step took. Page-level
+warm-up (aggregations and figures for each page's default widgets) lives in
+scripts/run_dashboard.py, since it needs Streamlit.
+"""
+
+import time
+import logging
+import contextlib
+from src.data_processing.loader import get_dataset_store
+from src.data_processing.aggregator import SOURCE_COLUMNS
+from src.data_processing.ranking import INTENSITY_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+@contextlib.contextmanager
+def timed(step, timings):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[step] = time.perf_counter() - start
+        logger.info("Warm-up: %s took %.0f ms", step, timings[step] * 1e3)
+
+def rank_metrics(cube):
+    # Totals are ranked on every dataset; source intensities back the Emission Sources page.
+    metrics = ['Total'] if cube.has_measure('Total') else []
+    metrics += [f"{source}{INTENSITY_SUFFIX}" for source in SOURCE_COLUMNS if metrics and cube.has_measure(source)]
+    return metrics
+
+def warm_up_data(timings=None):
+    timings = {} if timings is None else timings
+    store = get_dataset_store()
+    
+    with timed('datasets', timings):
+        store.preload()
+        store.wait()
+    
+    for name in store.names:
+        if not store.is_loaded(name):
+            logger.warning("Warm-up: skipping dataset '%s', it did not load", name)
+            continue
+        
+        with timed(f"{name} indexes", timings):
+            cube = store.cube(name)
+            store.rollup(name)
+            for metric in rank_metrics(cube):
+                store.rank_index(name, metric)
+    
+    return timings
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+In-process result cache keyed on scalar arguments.
+
+Unlike st.cache_data, arguments are never hashed by content: callers pass a dataset
+name and scalar parameters, and the dataset's version token is folded into the key
+so a reloaded dataset never serves stale results. Each cached function gets its own
+bounded LRU store with an optional TTL and hit/miss/eviction counters.
+"""
+
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import config
+
+_registry = {}
+
+def freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    return value
+
+def _share(value):
+    # Shallow copies are free under copy-on-write and keep callers from adding
+    # columns to the cached object itself.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+class ResultCache:
+    def __init__(self, name, max_entries=None, ttl=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def _drop(self, key):
+        _, _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+    
+    def get(self, key):
+        # Returns (found, value).
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+    
+    def set(self, key, value):
+        nbytes = estimate_size(value)
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            
+            self._entries[key] = (value, expires_at, nbytes)
+            self._bytes += nbytes
+            
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+def register_cache(cache):
+    _registry[cache.name] = cache
+    return cache
+
+def cached(version_of=None, version_arg='dataset', max_entries=None, ttl=None):
+    max_entries = config.CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    ttl = config.CACHE_TTL_SECONDS if ttl is None else ttl
+    
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = register_cache(ResultCache(f"{func.__module__}.{func.__qualname__}", max_entries, ttl))
+        
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(freeze(value) for value in bound.arguments.values())
+            if version_of is not None:
+                key = (version_of(bound.arguments[version_arg]),) + key
+            return key
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            
+            found, result = cache.get(key)
+            if not found:
+                result = func(*args, **kwargs)
+                cache.set(key, result)
+            
+            return _share(result)
+        
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        wrapper.make_key = make_key
+        
+        return wrapper
+    
+    return decorator
+
+def clear_all():
+    for cache in _registry.values():
+        cache.clear()
+
+def get_cache_stats():
+    stats = [cache.stats() for cache in _registry.values()]
+    if not stats:
+        return pd.DataFrame()
+    
+    return pd.DataFrame(stats).set_index('name')
\ No newline at end of file
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import streamlit as st
 
 def format_number(value, precision=1, suffix=''):
     if pd.isna(value) or value is None:
@@ -4,21 +4,35 @@ Custom metrics calculations for the CO2 emissions dashboard.
 
 import pandas as pd
 import numpy as np
-import streamlit as st
+from src.data_processing.aggregator import dataset_cache, get_year_data, get_country_data, aggregate_by_year
+from src.data_processing.loader import get_dataset_store
 
-def calculate_percent_change(df, column, year1, year2):
-    value1 = df[df['Year'] == year1][column].sum()
-    value2 = df[df['Year'] == year2][column].sum()
+def _total_for_year(dataset, column, year, country=None):
+    cube = get_dataset_store().cube(dataset)
+    if cube is None or not cube.has_measure(column):
+        return 0
+    
+    if country is not None:
+        if country not in cube.country_index:
+            return 0
+        return float(cube.range_total([column], year, year, country)[0])
+    
+    return float(get_dataset_store().rollup(dataset).range_total([column], year, year).sum())
+
+@dataset_cache
+def calculate_percent_change(dataset, column, year1, year2, country=None):
+    value1 = _total_for_year(dataset, column, year1, country)
+    value2 = _total_for_year(dataset, column, year2, country)
     
     if value1 == 0:
         return np.inf if value2 > 0 else -np.inf if value2 < 0 else 0
     
     return ((value2 - value1) / value1) * 100
 
-@st.cache_data
-def calculate_cagr(df, column, start_year, end_year):
-    start_value = df[df['Year'] == start_year][column].sum()
-    end_value = df[df['Year'] == end_year][column].sum()
+@dataset_cache
+def calculate_cagr(dataset, column, start_year, end_year, country=None):
+    start_value = _total_for_year(dataset, column, start_year, country)
+    end_value = _total_for_year(dataset, column, end_year, country)
     
     n_years = end_year - start_year
     
@@ -29,31 +43,54 @@ def calculate_cagr(df, column, start_year, end_year):
     
     return cagr
 
-@st.cache_data
-def calculate_moving_average(df, column, window=5):
+@dataset_cache
+def calculate_moving_average(dataset, column, window=5, country=None):
+    if country is None:
+        df = aggregate_by_year(dataset, column)
+    else:
+        df = get_country_data(dataset, country)
+    
+    if df.empty or column not in df.columns:
+        return pd.Series(dtype=float)
+    
     df = df.sort_values('Year')
     
-    return df[column].rolling(window=window, min_periods=1).mean()
+    return df[column].rolling(window=window, min_periods=1).mean().set_axis(df['Year'])
 
-@st.cache_data
-def calculate_emission_intensity(df, source_col, total_col):
+@dataset_cache
+def calculate_emission_intensity(dataset, source_col, total_col, year=None):
+    df = get_dataset_store().view(dataset) if year is None else get_year_data(dataset, year)
+    if df.empty:
+        return pd.Series(dtype=float)
+    
     intensity = (df[source_col] / df[total_col]) * 100
     
     intensity = intensity.replace([np.inf, -np.inf, np.nan], 0)
     
     return intensity
 
-@st.cache_data
-def calculate_top_contributors(df, column, year, n=10, min_value=None):
-    year_df = df[df['Year'] == year].copy()
+@dataset_cache
+def calculate_top_contributors(dataset, column, year, n=10, min_value=None):
+    cube = get_dataset_store().cube(dataset)
+    year_position = cube.year_position(year) if cube is not None and cube.has_measure(column) else None
+    if year_position is None:
+        return pd.DataFrame()
+    
+    rank_index = get_dataset_store().rank_index(dataset, column)
     
     # Apply minimum value filter if specified
+    eligible = None
     if min_value is not None:
-        year_df = year_df[year_df[column] >= min_value]
+        eligible = rank_index.values[:, year_position] >= min_value
     
-    top_n = year_df.sort_values(column, ascending=False).head(n)
+    country_positions = rank_index.top(year_position, n, eligible=eligible)
+    top_n = cube.rows(country_positions, np.full(len(country_positions), year_position))
     
-    total = year_df[column].sum()
+    # Ranked values already exclude Global and International Transport, so shares are of the country total.
+    year_values = rank_index.values[:, year_position]
+    if eligible is not None:
+        year_values = year_values[eligible]
+    total = np.nansum(year_values)
     if total > 0:
         top_n['Percentage'] = (top_n[column] / total) * 100
     else:
@@ -61,9 +98,9 @@ def calculate_top_contributors(df, column, year, n=10, min_value=None):
     
     return top_n
 
-@st.cache_data
-def calculate_reduction_needed(df, column, current_year, target_year, target_reduction_pct):
-    current_emissions = df[df['Year'] == current_year][column].sum()
+@dataset_cache
+def calculate_reduction_needed(dataset, column, current_year, target_year, target_reduction_pct):
+    current_emissions = _total_for_year(dataset, column, current_year)
     
     target_emissions = current_emissions * (1 - (target_reduction_pct / 100))
     
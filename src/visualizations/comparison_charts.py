@@ -1,13 +1,15 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import streamlit as st
 import config
+from src.visualizations.figure_cache import memoize_figure
+from src.visualizations import fast_figures, theme
 
+@memoize_figure('bar')
 def create_bar_comparison(df, category_col, value_col, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {value_col: value_col.replace('_', ' ').title(), category_col: ''},
         'color': value_col,
         'color_continuous_scale': config.CHOROPLETH_COLORSCALE,
@@ -16,6 +18,9 @@ def create_bar_comparison(df, category_col, value_col, title, **kwargs):
     
     kwargs = {**default_kwargs, **kwargs}
     
+    if fast_figures.use_fast_backend(kwargs, fast_figures.BAR_KWARGS):
+        return fast_figures.bar_comparison(df, category_col, value_col, title, **kwargs)
+    
     fig = px.bar(
         df,
         x=category_col,
@@ -30,10 +35,11 @@ def create_bar_comparison(df, category_col, value_col, title, **kwargs):
     
     return fig
 
+@memoize_figure('horizontal_bar')
 def create_horizontal_bar_comparison(df, category_col, value_col, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {value_col: value_col.replace('_', ' ').title(), category_col: ''},
         'color': value_col,
         'color_continuous_scale': config.CHOROPLETH_COLORSCALE,
@@ -43,6 +49,9 @@ def create_horizontal_bar_comparison(df, category_col, value_col, title, **kwarg
     
     kwargs = {**default_kwargs, **kwargs}
     
+    if fast_figures.use_fast_backend(kwargs, fast_figures.BAR_KWARGS):
+        return fast_figures.bar_comparison(df, category_col, value_col, title, **kwargs)
+    
     fig = px.bar(
         df,
         y=category_col,
@@ -57,6 +66,7 @@ def create_horizontal_bar_comparison(df, category_col, value_col, title, **kwarg
     
     return fig
 
+@memoize_figure('grouped_bar')
 def create_grouped_bar_chart(df, category_col, value_cols, title, **kwargs):
     melted_df = pd.melt(
         df, 
@@ -68,7 +78,7 @@ def create_grouped_bar_chart(df, category_col, value_cols, title, **kwargs):
     
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {'Value': 'Value', 'Metric': 'Metric'},
         'barmode': 'group',
         'text_auto': '.2s'
@@ -87,15 +97,20 @@ def create_grouped_bar_chart(df, category_col, value_cols, title, **kwargs):
     
     return fig
 
+def get_render_mode(n_points):
+    return 'webgl' if n_points > config.SCATTER_WEBGL_THRESHOLD else 'svg'
+
+@memoize_figure('scatter')
 def create_scatter_comparison(df, x_col, y_col, title, hover_name=None, size_col=None, color_col=None, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {
             x_col: x_col.replace('_', ' ').title(), 
             y_col: y_col.replace('_', ' ').title()
         },
-        'opacity': 0.7
+        'opacity': 0.7,
+        'render_mode': get_render_mode(len(df))
     }
     
     kwargs = {**default_kwargs, **kwargs}
@@ -113,17 +128,19 @@ def create_scatter_comparison(df, x_col, y_col, title, hover_name=None, size_col
     
     return fig
 
+@memoize_figure('bubble')
 def create_bubble_chart(df, x_col, y_col, size_col, title, hover_name=None, color_col=None, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {
             x_col: x_col.replace('_', ' ').title(), 
             y_col: y_col.replace('_', ' ').title(),
             size_col: size_col.replace('_', ' ').title()
         },
         'opacity': 0.7,
-        'size_max': 60
+        'size_max': 60,
+        'render_mode': get_render_mode(len(df))
     }
     
     kwargs = {**default_kwargs, **kwargs}
@@ -141,6 +158,7 @@ def create_bubble_chart(df, x_col, y_col, size_col, title, hover_name=None, colo
     
     return fig
 
+@memoize_figure('radar')
 def create_multi_metric_radar_chart(df, category_col, value_cols, title):
     categories = df[category_col].tolist()
     
@@ -157,7 +175,7 @@ def create_multi_metric_radar_chart(df, category_col, value_cols, title):
     fig.update_layout(
         title=title,
         height=config.DEFAULT_CHART_HEIGHT,
-        template='plotly_white',
+        template=theme.CHART_TEMPLATE,
         polar=dict(
             radialaxis=dict(
                 visible=True,
@@ -0,0 +1,252 @@
+"""
+Figure builders that emit Plotly figure dicts straight from NumPy arrays.
+
+Each builder reproduces the figure Plotly Express would produce for the matching
+create_* builder (same traces, hovertemplates, axes and template), but skips the
+melt/group-by pipeline and per-property validation: the dict is wrapped in a
+go.Figure with validation switched off. Builders that are asked for options they do
+not model are expected to fall back to Plotly Express (see supports()).
+"""
+
+import functools
+import numpy as np
+import pandas as pd
+import plotly.colors as pcolors
+import plotly.graph_objects as go
+import plotly.io as pio
+from _plotly_utils.basevalidators import ColorscaleValidator
+import config
+from src.utils.cache import freeze
+
+# Plotly Express switches line traces to WebGL above this many rows (render_mode='auto').
+PX_WEBGL_THRESHOLD = 1000
+
+BASE_KWARGS = {'height', 'template', 'labels'}
+SERIES_KWARGS = BASE_KWARGS | {'color_discrete_map', 'hover_data'}
+BAR_KWARGS = BASE_KWARGS | {'color', 'color_continuous_scale', 'text_auto', 'orientation'}
+PIE_KWARGS = {'height', 'template', 'color', 'color_discrete_map', 'hole'}
+
+def supports(kwargs, supported):
+    if not set(kwargs) <= supported:
+        return False
+    if kwargs.get('hover_data') is not None:
+        return False
+    if 'text_auto' in kwargs and not isinstance(kwargs['text_auto'], (str, bool)):
+        return False
+    return True
+
+def use_fast_backend(kwargs, supported):
+    return config.FIGURE_BACKEND == 'fast' and supports(kwargs, supported)
+
+@functools.lru_cache(maxsize=None)
+def get_template(name):
+    return pio.templates[name].to_plotly_json()
+
+def _colorway(template):
+    return template.get('layout', {}).get('colorway') or pcolors.qualitative.Plotly
+
+def _values(series):
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series.to_numpy()
+    return series.to_numpy(dtype=object)
+
+def _label(labels, col):
+    return (labels or {}).get(col, col)
+
+def _groups(series):
+    # Group order follows first appearance, as in Plotly Express.
+    codes, uniques = pd.factorize(series, sort=False)
+    return [(value, np.flatnonzero(codes == i)) for i, value in enumerate(uniques)]
+
+def _axis(title, anchor):
+    return {'anchor': anchor, 'domain': [0.0, 1.0], 'title': {'text': title}}
+
+def _base_layout(title, height, template):
+    layout = {'template': template}
+    if title is None:
+        layout['margin'] = {'t': 60}
+    else:
+        layout['title'] = {'text': title}
+    if height is not None:
+        layout['height'] = height
+    return layout
+
+def _cartesian_layout(x_title, y_title, title, height, template, legend_title=None):
+    legend = {'tracegroupgap': 0}
+    if legend_title is not None:
+        legend = {'title': {'text': legend_title}, 'tracegroupgap': 0}
+    
+    layout = {'xaxis': _axis(x_title, 'y'), 'yaxis': _axis(y_title, 'x'), 'legend': legend}
+    layout.update(_base_layout(title, height, template))
+    return layout
+
+@functools.lru_cache(maxsize=None)
+def _coerce_colorscale(colorscale):
+    # Coerced exactly as Plotly Express does it, so stop positions match.
+    coerced = ColorscaleValidator('colorscale', 'make_figure').validate_coerce(colorscale)
+    return [list(stop) for stop in coerced]
+
+def get_colorscale(colorscale):
+    return _coerce_colorscale(freeze(colorscale))
+
+def _coloraxis(colorscale, title, template):
+    coloraxis = {'colorbar': {'title': {'text': title}}}
+    if colorscale is None:
+        # Without an explicit scale Plotly Express falls back to the template's sequential one.
+        coloraxis['colorscale'] = template.get('layout', {}).get('colorscale', {}).get('sequential')
+        return coloraxis
+    
+    coloraxis['colorscale'] = get_colorscale(colorscale)
+    coloraxis['autocolorscale'] = False
+    return coloraxis
+
+def figure(data, layout, frames=None):
+    spec = {'data': data, 'layout': layout}
+    if frames:
+        spec['frames'] = frames
+    return go.Figure(spec, _validate=False)
+
+def _series_figure(groups, x_col, y_col, color_col, title, area, kwargs, n_rows):
+    # groups is a list of (name, x, y); color_col only names the legend.
+    labels = kwargs.get('labels')
+    color_map = kwargs.get('color_discrete_map') or {}
+    template = get_template(kwargs.get('template', 'plotly'))
+    colorway = _colorway(template)
+    
+    hover_xy = f"{_label(labels, x_col)}=%{{x}}<br>{_label(labels, y_col)}=%{{y}}<extra></extra>"
+    webgl = not area and n_rows > PX_WEBGL_THRESHOLD
+    
+    data = []
+    for i, (name, x, y) in enumerate(groups):
+        color = color_map.get(name) or colorway[i % len(colorway)]
+        trace = {'fillpattern': {'shape': ''}} if area else {}
+        trace.update({
+            'hovertemplate': hover_xy if color_col is None else f"{_label(labels, color_col)}={name}<br>{hover_xy}",
+            'legendgroup': name,
+            'line': {'color': color} if area else {'color': color, 'dash': 'solid'},
+            'marker': {'symbol': 'circle'},
+            'mode': 'lines',
+            'name': name
+        })
+        if not webgl:
+            trace['orientation'] = 'v'
+        trace['showlegend'] = color_col is not None
+        if area:
+            trace['stackgroup'] = '1'
+        trace.update({'x': x, 'xaxis': 'x', 'y': y, 'yaxis': 'y', 'type': 'scattergl' if webgl else 'scatter'})
+        data.append(trace)
+    
+    layout = _cartesian_layout(
+        _label(labels, x_col), _label(labels, y_col), title, kwargs.get('height'), template,
+        legend_title=None if color_col is None else _label(labels, color_col)
+    )
+    layout['hovermode'] = 'x unified'
+    if x_col == 'Year':
+        layout['xaxis'].update(tickmode='linear', dtick=5)
+    
+    return figure(data, layout)
+
+def line_chart(df, x_col, y_col, title, color_col=None, area=False, **kwargs):
+    x = _values(df[x_col])
+    y = _values(df[y_col])
+    
+    if color_col is None:
+        groups = [('', x, y)]
+    else:
+        groups = [(name, x[rows], y[rows]) for name, rows in _groups(df[color_col])]
+    
+    return _series_figure(groups, x_col, y_col, color_col, title, area, kwargs, len(df))
+
+def area_chart(df, x_col, y_col, title, color_col=None, **kwargs):
+    return line_chart(df, x_col, y_col, title, color_col=color_col, area=True, **kwargs)
+
+def stacked_area_chart(df, x_col, y_cols, title, **kwargs):
+    # One trace per column, matching px.area over the melted (Category, Value) frame.
+    x = _values(df[x_col])
+    groups = [(col, x, _values(df[col])) for col in y_cols]
+    return _series_figure(groups, x_col, 'Value', 'Category', title, True, kwargs, len(df) * len(y_cols))
+
+def bar_comparison(df, category_col, value_col, title, **kwargs):
+    labels = kwargs.get('labels')
+    template = get_template(kwargs.get('template', 'plotly'))
+    horizontal = kwargs.get('orientation', 'v') == 'h'
+    color_col = kwargs.get('color')
+    text_auto = kwargs.get('text_auto', False)
+    
+    categories = _values(df[category_col])
+    values = _values(df[value_col])
+    x_col, y_col = (value_col, category_col) if horizontal else (category_col, value_col)
+    
+    def hover(axis, col):
+        return f"{_label(labels, col)}=%{{marker.color}}" if col == color_col else f"{_label(labels, col)}=%{{{axis}}}"
+    
+    trace = {
+        'hovertemplate': f"{hover('x', x_col)}<br>{hover('y', y_col)}<extra></extra>",
+        'legendgroup': '',
+        'marker': {'color': _values(df[color_col]), 'coloraxis': 'coloraxis', 'pattern': {'shape': ''}} if color_col else {'color': _colorway(template)[0], 'pattern': {'shape': ''}},
+        'name': '',
+        'orientation': 'h' if horizontal else 'v',
+        'showlegend': False
+    }
+    trace['textposition'] = 'auto'
+    if text_auto:
+        value_axis = 'x' if horizontal else 'y'
+        trace['texttemplate'] = f"%{{{value_axis}}}" if text_auto is True else f"%{{{value_axis}:{text_auto}}}"
+    trace.update({
+        'x': values if horizontal else categories,
+        'xaxis': 'x',
+        'y': categories if horizontal else values,
+        'yaxis': 'y',
+        'type': 'bar'
+    })
+    
+    layout = _cartesian_layout(_label(labels, x_col), _label(labels, y_col), title, kwargs.get('height'), template)
+    if color_col:
+        layout['coloraxis'] = _coloraxis(kwargs.get('color_continuous_scale'), _label(labels, color_col), template)
+    layout['barmode'] = 'relative'
+    
+    category_axis = 'yaxis' if horizontal else 'xaxis'
+    layout[category_axis]['categoryorder'] = 'total ascending' if horizontal else 'total descending'
+    
+    return figure([trace], layout)
+
+def pie_chart(labels, values, title, **kwargs):
+    template = get_template(kwargs.get('template', 'plotly'))
+    labels = list(labels)
+    color = kwargs.get('color')
+    color_map = kwargs.get('color_discrete_map') or {}
+    colorway = _colorway(template)
+    
+    trace = {}
+    if color is not None:
+        trace['customdata'] = [[value] for value in color]
+    trace['domain'] = {'x': [0.0, 1.0], 'y': [0.0, 1.0]}
+    if kwargs.get('hole') is not None:
+        trace['hole'] = kwargs['hole']
+    trace['hovertemplate'] = 'label=%{label}<br>value=%{value}' + ('<br>color=%{customdata[0]}' if color is not None else '') + '<extra></extra>'
+    trace['labels'] = labels
+    trace['legendgroup'] = ''
+    
+    marker = {}
+    if color is not None:
+        seen = {}
+        for value in color:
+            if value not in seen:
+                seen[value] = color_map.get(value) or colorway[len(seen) % len(colorway)]
+        marker['colors'] = [seen[value] for value in color]
+    marker['line'] = {'color': 'white', 'width': 2}
+    trace['marker'] = marker
+    
+    trace.update({
+        'name': '',
+        'showlegend': True,
+        'values': np.asarray(values),
+        'type': 'pie',
+        'textinfo': 'percent+label',
+        'textposition': 'inside'
+    })
+    
+    layout = {'legend': {'tracegroupgap': 0}}
+    layout.update(_base_layout(title, kwargs.get('height'), template))
+    
+    return figure([trace], layout)
\ No newline at end of file
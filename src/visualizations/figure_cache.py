@@ -0,0 +1,69 @@
+"""
+Figure-level memoization for the chart builders.
+
+Figures are keyed on a chart type, the version token of the dataset they were drawn
+from and their parameters, and kept as serialized JSON in a bounded ResultCache. A
+hit rebuilds the figure from JSON without re-validating it, skipping Plotly Express
+(melting, trace grouping, defaults) entirely; storing JSON also means callers that
+tweak the returned figure never touch the cached copy.
+"""
+
+import functools
+import json
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import config
+from src.data_processing.loader import get_dataset_version
+from src.utils.cache import ResultCache, register_cache, freeze
+from src.visualizations.payload import minimize_figure
+
+figure_cache = register_cache(
+    ResultCache('figures', config.FIGURE_CACHE_MAX_ENTRIES, config.CACHE_TTL_SECONDS)
+)
+
+def _param(value):
+    # Frames and arrays are described by the data key, not hashed by content.
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return type(value).__name__
+    return freeze(value)
+
+def figure_key(chart_type, data_key, params=()):
+    # data_key is (dataset name, *selection) for whatever produced the figure's data.
+    dataset, *selection = data_key
+    return (chart_type, get_dataset_version(dataset), freeze(selection), freeze(params))
+
+def get_figure(chart_type, data_key, params, build):
+    if not config.FIGURE_CACHE_ENABLED:
+        return minimize_figure(build(), chart_type)
+    
+    key = figure_key(chart_type, data_key, params)
+    found, spec = figure_cache.get(key)
+    if found:
+        # The stored JSON came from a valid figure, so skip re-validating it.
+        return go.Figure(json.loads(spec), _validate=False)
+    
+    fig = minimize_figure(build(), chart_type)
+    figure_cache.set(key, fig.to_json())
+    return fig
+
+def memoize_figure(chart_type):
+    # Builders stay uncached unless the caller says where the data came from via data_key.
+    def decorator(builder):
+        @functools.wraps(builder)
+        def wrapper(*args, data_key=None, **kwargs):
+            if data_key is None:
+                return minimize_figure(builder(*args, **kwargs), chart_type)
+            
+            params = (
+                tuple(_param(arg) for arg in args),
+                tuple(sorted((name, _param(value)) for name, value in kwargs.items()))
+            )
+            return get_figure(chart_type, data_key, params, lambda: builder(*args, **kwargs))
+        
+        return wrapper
+    
+    return decorator
+
+def clear_figure_cache():
+    figure_cache.clear()
\ No newline at end of file
@@ -1,21 +1,83 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import streamlit as st
 import numpy as np
 import config
+from src.visualizations.figure_cache import memoize_figure
+from src.visualizations import fast_figures, theme
+from src.data_processing.geometry import has_world_geometry, get_world_geojson, get_geometry_ids, get_geometry_id, get_geometry_level
 
+def use_bundled_geometry():
+    return config.MAP_GEOMETRY == 'bundled' and has_world_geometry()
+
+def _geo_layout(bundled=False):
+    # MAP_TEMPLATE styles Plotly's base map; bundled shapes replace it, so its layers are switched off.
+    if not bundled:
+        return {}
+    return dict(visible=False, showcoastlines=False, showland=False, showocean=False)
+
+def _geometry_template(template, level):
+    # Every choropleth trace of the figure inherits its shapes from the template, so they are sent once.
+    data = template.get('data', {})
+    choropleth = {**(data.get('choropleth') or [{}])[0], 'geojson': get_world_geojson(level)}
+    return {**template, 'data': {**data, 'choropleth': [choropleth]}}
+
+def _land_trace(covered=()):
+    # Countries that are not always coloured by the data get the land colour of Plotly's base map.
+    covered = set(covered)
+    ids = [code for code in get_geometry_ids() if code not in covered]
+    return {
+        'type': 'choropleth',
+        'locationmode': 'geojson-id',
+        'locations': ids,
+        'z': np.zeros(len(ids)),
+        'colorscale': [[0, 'lightgray'], [1, 'lightgray']],
+        'showscale': False,
+        'hoverinfo': 'skip',
+        'marker': {'line': {'color': 'white', 'width': 0.5}},
+        'name': ''
+    }
+
+def _add_bundled_geometry(fig, level, covered=()):
+    # The land trace is drawn first so it sits underneath; frames are re-pointed past it.
+    fig.add_trace(go.Choropleth(_land_trace(covered)))
+    fig.data = (fig.data[-1],) + fig.data[:-1]
+    
+    for frame in fig.frames:
+        frame.traces = list(range(1, len(frame.data) + 1))
+    
+    fig.update_layout(template=_geometry_template(fig.layout.template.to_plotly_json(), level), geo=_geo_layout(True))
+
+def _coverage(locations, values, frames=None):
+    # ISO codes with a value in some frame (drawn by the data trace) and in every frame.
+    finite = pd.Series(np.isfinite(np.asarray(values, dtype=np.float64)))
+    locations = pd.Series(np.asarray(locations, dtype=object))
+    if frames is None:
+        drawn = set(locations[finite])
+        return drawn, drawn
+    
+    counts = finite.groupby([locations, pd.Series(np.asarray(frames))]).any().groupby(level=0).sum()
+    n_frames = pd.Series(np.asarray(frames)).nunique()
+    return set(counts.index[counts > 0]), set(counts.index[counts == n_frames])
+
+@memoize_figure('choropleth')
 def create_choropleth_map(df, iso_col, color_col, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_MAP_HEIGHT,
         'color_continuous_scale': config.CHOROPLETH_COLORSCALE,
         'labels': {color_col: color_col.replace('_', ' ').title()},
-        'template': 'plotly_white',
+        'template': theme.MAP_TEMPLATE,
         'projection': 'natural earth'
     }
     
     kwargs = {**default_kwargs, **kwargs}
     
+    bundled = use_bundled_geometry()
+    if bundled:
+        level = get_geometry_level(kwargs.get('scope', 'world'))
+        drawn, _ = _coverage(df[iso_col], df[color_col])
+        kwargs['locationmode'] = 'geojson-id'
+    
     fig = px.choropleth(
         df,
         locations=iso_col,
@@ -24,28 +86,16 @@ def create_choropleth_map(df, iso_col, color_col, title, **kwargs):
         **kwargs
     )
     
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=50, b=0),
-        geo=dict(
-            showcoastlines=True,
-            coastlinecolor="Black",
-            showland=True,
-            landcolor="lightgray",
-            showocean=True,
-            oceancolor="aliceblue",
-            showlakes=True,
-            lakecolor="aliceblue",
-            showrivers=True,
-            rivercolor="aliceblue"
-        )
-    )
+    if bundled:
+        _add_bundled_geometry(fig, level, drawn)
     
     return fig
 
+@memoize_figure('bubble_map')
 def create_bubble_map(df, lat_col, lon_col, size_col, hover_name_col, title, color_col=None, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_MAP_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.MAP_TEMPLATE,
         'labels': {size_col: size_col.replace('_', ' ').title()},
         'projection': 'natural earth'
     }
@@ -74,70 +124,55 @@ def create_bubble_map(df, lat_col, lon_col, size_col, hover_name_col, title, col
             **kwargs
         )
     
-    # Common layout adjustments
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=50, b=0),
-        geo=dict(
-            showcoastlines=True,
-            coastlinecolor="Black",
-            showland=True,
-            landcolor="lightgray",
-            showocean=True,
-            oceancolor="aliceblue",
-            showlakes=True,
-            lakecolor="aliceblue",
-            showrivers=True,
-            rivercolor="aliceblue"
-        )
-    )
-    
     return fig
 
+@memoize_figure('regional_choropleth')
 def create_regional_choropleth(df, region_col, color_col, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_MAP_HEIGHT,
         'color_continuous_scale': config.CHOROPLETH_COLORSCALE,
         'labels': {color_col: color_col.replace('_', ' ').title()},
-        'template': 'plotly_white',
+        'template': theme.MAP_TEMPLATE,
         'projection': 'natural earth',
         'scope': 'world'
     }
     
     kwargs = {**default_kwargs, **kwargs}
 
-    fig = px.choropleth(
-        df,
-        locations=region_col,
-        locationmode="country names",
-        color=color_col,
-        title=title,
-        **kwargs
-    )
-    
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=50, b=0),
-        geo=dict(
-            showcoastlines=True,
-            coastlinecolor="Black",
-            showland=True,
-            landcolor="lightgray",
-            showocean=True,
-            oceancolor="aliceblue",
-            showlakes=True,
-            lakecolor="aliceblue",
-            showrivers=True,
-            rivercolor="aliceblue"
+    bundled = use_bundled_geometry()
+    if bundled:
+        # The bundled shapes are keyed by ISO code, so names are resolved up front.
+        level = get_geometry_level(kwargs['scope'])
+        locations = df[region_col].map(get_geometry_id)
+        drawn, _ = _coverage(locations, df[color_col])
+        kwargs.update(locationmode='geojson-id', hover_name=region_col)
+        fig = px.choropleth(
+            df,
+            locations=locations,
+            color=color_col,
+            title=title,
+            **kwargs
+        )
+        _add_bundled_geometry(fig, level, drawn)
+    else:
+        fig = px.choropleth(
+            df,
+            locations=region_col,
+            locationmode="country names",
+            color=color_col,
+            title=title,
+            **kwargs
         )
-    )
     
     return fig
 
+@memoize_figure('animated_choropleth')
 def animate_choropleth_by_year(df, iso_col, color_col, year_col, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_MAP_HEIGHT,
         'color_continuous_scale': config.CHOROPLETH_COLORSCALE,
         'labels': {color_col: color_col.replace('_', ' ').title()},
-        'template': 'plotly_white',
+        'template': theme.MAP_TEMPLATE,
         'projection': 'natural earth',
         'animation_frame': year_col,
         'range_color': [df[color_col].min(), df[color_col].max()]
@@ -145,6 +180,12 @@ def animate_choropleth_by_year(df, iso_col, color_col, year_col, title, **kwargs
     
     kwargs = {**default_kwargs, **kwargs}
     
+    bundled = use_bundled_geometry()
+    if bundled:
+        level = config.MAP_ANIMATION_GEOMETRY_LEVEL
+        _, always_drawn = _coverage(df[iso_col], df[color_col], df[kwargs['animation_frame']])
+        kwargs['locationmode'] = 'geojson-id'
+    
     fig = px.choropleth(
         df,
         locations=iso_col,
@@ -153,23 +194,140 @@ def animate_choropleth_by_year(df, iso_col, color_col, year_col, title, **kwargs
         **kwargs
     )
     
-    fig.update_layout(
-        margin=dict(l=0, r=0, t=50, b=0),
-        geo=dict(
-            showcoastlines=True,
-            coastlinecolor="Black",
-            showland=True,
-            landcolor="lightgray",
-            showocean=True,
-            oceancolor="aliceblue",
-            showlakes=True,
-            lakecolor="aliceblue",
-            showrivers=True,
-            rivercolor="aliceblue"
-        )
-    )
+    if bundled:
+        _add_bundled_geometry(fig, level, always_drawn)
     
     fig.layout.updatemenus[0].buttons[0].args[1]['frame']['duration'] = 800
     fig.layout.updatemenus[0].buttons[0].args[1]['transition']['duration'] = 300
     
-    return fig
\ No newline at end of file
+    return fig
+
+def _delta_frames(values, chunks, positions, frame_names, keyframe_interval, title):
+    # A frame only restyles the chunks with a value that changed since they were last sent;
+    # every keyframe_interval-th frame resends all of them.
+    shown = [None] * len(chunks)
+    frames = []
+    
+    for n, position in enumerate(positions):
+        keyframe = n % keyframe_interval == 0
+        traces = []
+        data = []
+        for i, chunk in enumerate(chunks):
+            z = values[chunk, position]
+            if keyframe or not np.array_equal(shown[i], z, equal_nan=True):
+                shown[i] = z
+                traces.append(i)
+                data.append({'type': 'choropleth', 'z': z})
+        
+        frames.append({
+            'name': frame_names[n],
+            'data': data,
+            'traces': traces,
+            'layout': {'title': {'text': f"{title} ({frame_names[n]})"}}
+        })
+    
+    return frames
+
+@memoize_figure('delta_choropleth')
+def animate_choropleth_delta(matrix, title, year_step=None, **kwargs):
+    # matrix is countries x years, indexed by ISO code (optionally with a Country level for
+    # hover text). Frames are deltas, so playback and slider seeks always run forward from
+    # the nearest keyframe.
+    default_kwargs = {
+        'height': config.DEFAULT_MAP_HEIGHT,
+        'color_continuous_scale': config.CHOROPLETH_COLORSCALE,
+        'value_label': 'Value',
+        'template': theme.MAP_TEMPLATE,
+        'projection': 'natural earth',
+        'range_color': None,
+        'chunk_size': config.CHOROPLETH_CHUNK_SIZE,
+        'keyframe_interval': config.CHOROPLETH_KEYFRAME_INTERVAL,
+        'frame_duration': 800
+    }
+    
+    kwargs = {**default_kwargs, **kwargs}
+    year_step = config.CHOROPLETH_ANIMATION_STEP if year_step is None else year_step
+    
+    locations = matrix.index.get_level_values(0).to_numpy(dtype=object)
+    names = matrix.index.get_level_values(-1).to_numpy(dtype=object)
+    # Rounded to the precision the hover prints: changes below it are never sent, and every
+    # change the hover would show is.
+    decimals = config.CHOROPLETH_HOVER_DECIMALS
+    values = np.round(matrix.to_numpy(dtype=np.float64), decimals).astype(np.float32)
+    
+    positions = list(range(0, len(matrix.columns), year_step))
+    if positions and positions[-1] != len(matrix.columns) - 1:
+        positions.append(len(matrix.columns) - 1)
+    frame_names = [str(matrix.columns[p]) for p in positions]
+    
+    zmin, zmax = kwargs['range_color'] or (float(np.nanmin(values)), float(np.nanmax(values)))
+    
+    # Largest emitters first, so the countries whose colour actually moves share few chunks.
+    peaks = np.where(np.isnan(values), -np.inf, values).max(axis=1)
+    order = np.argsort(-peaks, kind='stable')
+    chunks = [order[i:i + kwargs['chunk_size']] for i in range(0, len(order), kwargs['chunk_size'])]
+    
+    frames = _delta_frames(values, chunks, positions, frame_names, kwargs['keyframe_interval'], title)
+    
+    hovertemplate = f"<b>%{{text}}</b><br>{kwargs['value_label']}: %{{z:,.{decimals}f}}<extra></extra>"
+    data = [{
+        'type': 'choropleth',
+        'locations': locations[chunk],
+        'text': names[chunk],
+        'z': values[chunk, positions[0]],
+        'coloraxis': 'coloraxis',
+        'hovertemplate': hovertemplate,
+        'name': ''
+    } for chunk in chunks]
+    
+    bundled = use_bundled_geometry()
+    if bundled:
+        finite = np.isfinite(values[:, positions])
+        for trace in data:
+            trace['locationmode'] = 'geojson-id'
+        
+        data.insert(0, _land_trace(locations[finite.all(axis=1)]))
+        for frame in frames:
+            frame['traces'] = [i + 1 for i in frame['traces']]
+    
+    play = {'frame': {'duration': kwargs['frame_duration'], 'redraw': True}, 'fromcurrent': True, 'transition': {'duration': 0}}
+    seek = {'frame': {'duration': 0, 'redraw': True}, 'mode': 'immediate', 'transition': {'duration': 0}}
+    steps = [{
+        'args': [frame_names[n - n % kwargs['keyframe_interval']:n + 1], seek],
+        'label': frame_names[n],
+        'method': 'animate'
+    } for n in range(len(frame_names))]
+    
+    template = fast_figures.get_template(kwargs['template'])
+    layout = {
+        'template': _geometry_template(template, config.MAP_ANIMATION_GEOMETRY_LEVEL) if bundled else template,
+        'title': {'text': f"{title} ({frame_names[0]})" if frame_names else title},
+        'height': kwargs['height'],
+        'coloraxis': {
+            'colorscale': fast_figures.get_colorscale(kwargs['color_continuous_scale']),
+            'cmin': zmin,
+            'cmax': zmax,
+            'colorbar': {'title': {'text': kwargs['value_label']}}
+        },
+        'geo': {'projection': {'type': kwargs['projection']}, **_geo_layout(bundled)},
+        'updatemenus': [{
+            'type': 'buttons',
+            'direction': 'left',
+            'showactive': False,
+            'x': 0.1, 'y': 0, 'xanchor': 'right', 'yanchor': 'top',
+            'pad': {'r': 10, 't': 70},
+            'buttons': [
+                {'label': '&#9654;', 'method': 'animate', 'args': [None, play]},
+                {'label': '&#9724;', 'method': 'animate', 'args': [[None], seek]}
+            ]
+        }],
+        'sliders': [{
+            'active': 0,
+            'currentvalue': {'prefix': 'Year='},
+            'len': 0.9, 'x': 0.1, 'y': 0, 'xanchor': 'left', 'yanchor': 'top',
+            'pad': {'b': 10, 't': 60},
+            'steps': steps
+        }]
+    }
+    
+    return fast_figures.figure(data, layout, frames)
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Figure JSON minimizer, applied to every figure the chart builders return.
+
+Data arrays are rounded to config.FIGURE_SIGNIFICANT_DIGITS. Integer-valued arrays are sent as
+the smallest typed array plotly.js accepts; float arrays take whichever is shorter, the rounded
+JSON list or a float64 typed array. The template keeps only the trace types and subplot
+sections the figure uses, and customdata that no hover/text template reads is dropped.
+"""
+
+import json
+import base64
+import logging
+import numpy as np
+import plotly.graph_objects as go
+from _plotly_utils.utils import to_typed_array_spec
+import config
+
+logger = logging.getLogger(__name__)
+
+TYPED_ARRAY_DTYPES = {
+    'i1': np.int8, 'u1': np.uint8, 'i2': np.int16, 'u2': np.uint16,
+    'i4': np.int32, 'u4': np.uint32, 'f4': np.float32, 'f8': np.float64
+}
+
+# Shapes and colour scales are not data; geojson is already rounded when it is built.
+SKIPPED_KEYS = {'geojson', 'colorscale', 'range'}
+
+# Template layout sections that only matter for figures with that kind of subplot.
+SUBPLOT_SECTIONS = ('geo', 'polar', 'ternary', 'scene', 'mapbox', 'map', 'smith')
+SUBPLOT_TRACE_TYPES = {
+    'choropleth': 'geo', 'scattergeo': 'geo',
+    'scatterpolar': 'polar', 'scatterpolargl': 'polar', 'barpolar': 'polar'
+}
+
+def round_significant(values, digits):
+    scaled = np.isfinite(values) & (values != 0)
+    magnitude = np.zeros(values.shape)
+    magnitude[scaled] = np.floor(np.log10(np.abs(values[scaled])))
+    factor = 10.0 ** (digits - 1 - magnitude)
+    return np.where(scaled, np.round(values * factor) / factor, values)
+
+def _numeric_array(value):
+    if isinstance(value, dict):
+        if 'bdata' not in value:
+            return None
+        array = np.frombuffer(base64.b64decode(value['bdata']), dtype=TYPED_ARRAY_DTYPES[value['dtype']])
+        if 'shape' in value:
+            array = array.reshape([int(n) for n in value['shape'].split(',')])
+        return array
+    
+    if isinstance(value, (list, tuple)):
+        if not value or isinstance(value[0], (str, bool, dict)):
+            return None
+        try:
+            value = np.asarray(value)
+        except ValueError:
+            return None
+    
+    if isinstance(value, np.ndarray) and value.size and value.dtype.kind in 'iuf':
+        return value
+    return None
+
+def _encode(values, digits):
+    if values.dtype.kind in 'iu':
+        return to_typed_array_spec(values.astype(np.int64))
+    
+    values = round_significant(values.astype(np.float64), digits)
+    finite = np.isfinite(values)
+    if finite.all() and (values == np.round(values)).all() and np.abs(values).max() <= np.iinfo(np.int32).max:
+        return to_typed_array_spec(values.astype(np.int64))
+    
+    as_list = values.astype(object)
+    as_list[~finite] = None
+    as_list = as_list.tolist()
+    
+    typed = to_typed_array_spec(values)
+    if len(json.dumps(as_list)) <= len(typed['bdata']):
+        return as_list
+    return typed
+
+def _reads_customdata(trace):
+    return any('customdata' in str(trace.get(key, '')) for key in ('hovertemplate', 'texttemplate'))
+
+def _minimize_trace(trace, digits):
+    if 'customdata' in trace and 'hovertemplate' in trace and not _reads_customdata(trace):
+        trace = {key: value for key, value in trace.items() if key != 'customdata'}
+    
+    minimized = {}
+    for key, value in trace.items():
+        if key in SKIPPED_KEYS:
+            minimized[key] = value
+            continue
+        
+        array = _numeric_array(value)
+        if array is not None:
+            minimized[key] = _encode(array, digits)
+        elif isinstance(value, dict):
+            minimized[key] = _minimize_trace(value, digits)
+        else:
+            minimized[key] = value
+    
+    return minimized
+
+def _prune_template(template, layout, trace_types):
+    sections = {SUBPLOT_TRACE_TYPES[t] for t in trace_types if t in SUBPLOT_TRACE_TYPES}
+    sections |= {key for key in layout if key.rstrip('0123456789') in SUBPLOT_SECTIONS}
+    
+    template_layout = {
+        key: value for key, value in template.get('layout', {}).items()
+        if key not in SUBPLOT_SECTIONS or key in sections
+    }
+    template_data = {
+        trace_type: traces for trace_type, traces in template.get('data', {}).items()
+        if trace_type in trace_types
+    }
+    return {'data': template_data, 'layout': template_layout}
+
+def minimize_spec(spec, digits=None):
+    digits = config.FIGURE_SIGNIFICANT_DIGITS if digits is None else digits
+    data = [_minimize_trace(trace, digits) for trace in spec.get('data', [])]
+    frames = [
+        {**frame, 'data': [_minimize_trace(trace, digits) for trace in frame.get('data', [])]}
+        for frame in spec.get('frames', [])
+    ]
+    
+    layout = dict(spec.get('layout', {}))
+    if 'template' in layout:
+        trace_types = {trace.get('type', 'scatter') for trace in data}
+        layout['template'] = _prune_template(layout['template'], layout, trace_types)
+    
+    minimized = {'data': data, 'layout': layout}
+    if frames:
+        minimized['frames'] = frames
+    return minimized
+
+def minimize_figure(fig, label='figure'):
+    if not config.FIGURE_MINIMIZE_PAYLOAD:
+        return fig
+    
+    minimized = go.Figure(minimize_spec(fig.to_plotly_json()), _validate=False)
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%s payload: %d -> %d bytes", label, len(fig.to_json()), len(minimized.to_json()))
+    
+    return minimized
\ No newline at end of file
@@ -1,14 +1,16 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import streamlit as st
 import numpy as np
 import config
+from src.visualizations.figure_cache import memoize_figure
+from src.visualizations import fast_figures, theme
 
+@memoize_figure('pie')
 def create_pie_chart(labels, values, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'color': labels,
         'color_discrete_map': config.EMISSION_SOURCES_COLORS if set(labels).issubset(config.EMISSION_SOURCES_COLORS.keys()) else None,
         'hole': 0.3
@@ -16,6 +18,9 @@ def create_pie_chart(labels, values, title, **kwargs):
     
     kwargs = {**default_kwargs, **kwargs}
     
+    if fast_figures.use_fast_backend(kwargs, fast_figures.PIE_KWARGS):
+        return fast_figures.pie_chart(labels, values, title, **kwargs)
+    
     fig = px.pie(
         names=labels,
         values=values,
@@ -31,10 +36,11 @@ def create_pie_chart(labels, values, title, **kwargs):
     
     return fig
 
+@memoize_figure('donut')
 def create_donut_chart(labels, values, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'color': labels,
         'color_discrete_map': config.EMISSION_SOURCES_COLORS if set(labels).issubset(config.EMISSION_SOURCES_COLORS.keys()) else None,
         'hole': 0.6
@@ -66,10 +72,11 @@ def create_donut_chart(labels, values, title, **kwargs):
     
     return fig
 
+@memoize_figure('treemap')
 def create_treemap(df, path, values, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'color_discrete_map': config.EMISSION_SOURCES_COLORS if path[-1] in df.columns and set(df[path[-1]].unique()).issubset(config.EMISSION_SOURCES_COLORS.keys()) else None,
     }
     
@@ -89,10 +96,11 @@ def create_treemap(df, path, values, title, **kwargs):
     
     return fig
 
+@memoize_figure('sunburst')
 def create_sunburst(df, path, values, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'color_discrete_map': config.EMISSION_SOURCES_COLORS if path[-1] in df.columns and set(df[path[-1]].unique()).issubset(config.EMISSION_SOURCES_COLORS.keys()) else None,
     }
     
@@ -112,6 +120,7 @@ def create_sunburst(df, path, values, title, **kwargs):
     
     return fig
 
+@memoize_figure('stacked_bar_by_source')
 def create_stacked_bar_by_source(df, x_col, title, normalize=False, **kwargs):
     source_columns = ["Coal", "Oil", "Gas", "Cement", "Flaring", "Other"]
     
@@ -122,7 +131,7 @@ def create_stacked_bar_by_source(df, x_col, title, normalize=False, **kwargs):
         fig.update_layout(
             title=title,
             height=config.DEFAULT_CHART_HEIGHT,
-            template='plotly_white',
+            template=theme.CHART_TEMPLATE,
             annotations=[dict(
                 text="No data available",
                 xref="paper", yref="paper",
@@ -146,7 +155,7 @@ def create_stacked_bar_by_source(df, x_col, title, normalize=False, **kwargs):
     
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'barmode': 'stack',
         'color_discrete_map': {source: config.EMISSION_SOURCES_COLORS.get(source.replace('_pct', ''), '#000000') for source in value_cols}
     }
@@ -176,13 +185,17 @@ def create_stacked_bar_by_source(df, x_col, title, normalize=False, **kwargs):
     
     return fig
 
-def create_source_heatmap(df, title, **kwargs):
+@memoize_figure('source_heatmap')
+def create_source_heatmap(df, title, value_format='.1f', **kwargs):
+    # Cell labels are one trace-level texttemplate; with no fixed font colour Plotly picks
+    # a contrasting label colour per cell. Large matrices are left unlabelled.
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'color_continuous_scale': 'Viridis',
         'aspect': 'auto',
-        'labels': {'color': 'Intensity'}
+        'labels': {'color': 'Intensity'},
+        'text_auto': value_format if df.size <= config.HEATMAP_MAX_LABELED_CELLS else False
     }
     
     kwargs = {**default_kwargs, **kwargs}
@@ -198,28 +211,16 @@ def create_source_heatmap(df, title, **kwargs):
         yaxis_title="Category"
     )
     
-    annotations = []
-    for i, row in enumerate(df.index):
-        for j, col in enumerate(df.columns):
-            annotations.append(dict(
-                x=j,
-                y=i,
-                text=f"{df.iloc[i, j]:.1f}",
-                font=dict(color='white' if df.iloc[i, j] > df.values.mean() else 'black'),
-                showarrow=False
-            ))
-    
-    fig.update_layout(annotations=annotations)
-    
     return fig
 
-def create_source_intensity_scatter(df, source_col, total_col, label_col, title, **kwargs):
+@memoize_figure('source_intensity_scatter')
+def create_source_intensity_scatter(df, source_col, total_col, label_col, title, label_top_k=None, **kwargs):
     df = df.copy()
     df['intensity'] = (df[source_col] / df[total_col]) * 100
     
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {
             'intensity': f"{source_col} Intensity (%)", 
             total_col: total_col.replace('_', ' ').title()
@@ -251,25 +252,35 @@ def create_source_intensity_scatter(df, source_col, total_col, label_col, title,
         annotation_position="top right"
     )
     
-    for i, row in df.iterrows():
-        if (row['intensity'] > avg_intensity * 1.5) or (row['intensity'] < avg_intensity * 0.5):
-            fig.add_annotation(
-                x=row[total_col],
-                y=row['intensity'],
-                text=row[label_col],
-                showarrow=True,
-                arrowhead=1
-            )
+    # Outliers sit above 1.5x or below 0.5x the average; label_top_k keeps the largest deviations.
+    intensity = df['intensity'].to_numpy(dtype=np.float64)
+    deviation = np.abs(intensity - avg_intensity)
+    outliers = np.flatnonzero((intensity > avg_intensity * 1.5) | (intensity < avg_intensity * 0.5))
+    if label_top_k is not None:
+        outliers = outliers[np.argsort(-deviation[outliers], kind='stable')[:label_top_k]]
+    
+    if outliers.size:
+        fig.add_trace(go.Scatter(
+            x=df[total_col].to_numpy()[outliers],
+            y=intensity[outliers],
+            text=df[label_col].to_numpy(dtype=object)[outliers],
+            mode='text',
+            textposition='top center',
+            hoverinfo='skip',
+            showlegend=False,
+            name='Outliers'
+        ))
     
     return fig
 
+@memoize_figure('source_spider')
 def create_source_comparison_spider(df, category_col, source_cols, title):
     if category_col not in df.columns or not all(col in df.columns for col in source_cols):
         fig = go.Figure()
         fig.update_layout(
             title=title,
             height=config.DEFAULT_CHART_HEIGHT,
-            template='plotly_white',
+            template=theme.CHART_TEMPLATE,
             annotations=[dict(
                 text="Required columns not available",
                 xref="paper", yref="paper",
@@ -301,7 +312,7 @@ def create_source_comparison_spider(df, category_col, source_cols, title):
     fig.update_layout(
         title=title,
         height=config.DEFAULT_CHART_HEIGHT,
-        template='plotly_white',
+        template=theme.CHART_TEMPLATE,
         polar=dict(
             radialaxis=dict(
                 visible=True,
@@ -0,0 +1,54 @@
+"""
+Plotly templates for the dashboard, built and registered once at import.
+
+Referring to a template by name does not make figures smaller: Plotly resolves the name and
+inlines the whole template into every figure's JSON. CHART_TEMPLATE is therefore plotly_white
+cut down to the trace types the dashboard draws, and payload.minimize_figure drops whatever
+part of it a given figure does not use. MAP_TEMPLATE adds the map margins, the base-map styling
+of the geo subplot and the project's choropleth colour scale, so map builders no longer restyle
+each figure.
+"""
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import config
+
+CHART_TEMPLATE = 'gcb'
+MAP_TEMPLATE = 'gcb_map'
+
+TRACE_TYPES = ('scatter', 'scattergl', 'bar', 'pie', 'heatmap', 'choropleth', 'scattergeo', 'scatterpolar')
+
+MAP_MARGIN = dict(l=0, r=0, t=50, b=0)
+
+def base_map_geo():
+    return dict(
+        showcoastlines=True,
+        coastlinecolor="Black",
+        showland=True,
+        landcolor="lightgray",
+        showocean=True,
+        oceancolor="aliceblue",
+        showlakes=config.MAP_SHOW_LAKES,
+        lakecolor="aliceblue",
+        showrivers=config.MAP_SHOW_RIVERS,
+        rivercolor="aliceblue"
+    )
+
+def _chart_template():
+    base = pio.templates['plotly_white']
+    template = go.layout.Template(layout=base.layout)
+    for trace_type in TRACE_TYPES:
+        template.data[trace_type] = base.data[trace_type]
+    return template
+
+def _map_template():
+    template = _chart_template()
+    template.layout.update(
+        margin=MAP_MARGIN,
+        geo=base_map_geo(),
+        colorscale={'sequential': config.CHOROPLETH_COLORSCALE}
+    )
+    return template
+
+pio.templates[CHART_TEMPLATE] = _chart_template()
+pio.templates[MAP_TEMPLATE] = _map_template()
\ No newline at end of file
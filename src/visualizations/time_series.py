@@ -1,19 +1,96 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import streamlit as st
+import numpy as np
 import config
+from src.visualizations.figure_cache import memoize_figure
+from src.visualizations import fast_figures, theme
 
+def get_point_budget(width_px=None):
+    width_px = config.CHART_WIDTH_PX if width_px is None else width_px
+    return max(int(width_px * config.LTTB_POINTS_PER_PIXEL), 3)
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, from each bucket,
+    # the point spanning the largest triangle with the previous pick and the next bucket's mean.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    
+    # Global extremes always survive, whatever bucket they fall in.
+    return np.union1d(selected, [int(y.argmin()), int(y.argmax())])
+
+def _downsample_positions(x, y, threshold):
+    finite = np.isfinite(y)
+    if finite.all():
+        return lttb_indices(x, y, threshold)
+    
+    positions = np.flatnonzero(finite)
+    keep = positions[lttb_indices(x[positions], y[positions], threshold)] if positions.size else positions
+    
+    # Missing values next to real ones are kept so gaps still break the line.
+    edge = ~finite & (np.r_[finite[1:], False] | np.r_[False, finite[:-1]])
+    return np.union1d(keep, np.flatnonzero(edge))
+
+def downsample_frame(df, x_col, y_col, color_col=None, width_px=None):
+    # LTTB per trace (per color_col group), sized to the chart's pixel width.
+    threshold = get_point_budget(width_px)
+    if df.empty:
+        return df
+    
+    x = df[x_col].to_numpy(dtype=np.float64)
+    y = df[y_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    if color_col is None:
+        if len(df) <= threshold:
+            return df
+        return df.iloc[_downsample_positions(x, y, threshold)]
+    
+    codes, _ = pd.factorize(df[color_col], sort=False)
+    keep = []
+    for code in range(codes.max() + 1):
+        rows = np.flatnonzero(codes == code)
+        keep.append(rows[_downsample_positions(x[rows], y[rows], threshold)])
+    
+    return df.iloc[np.sort(np.concatenate(keep))] if keep else df
+
+@memoize_figure('line')
 def create_line_chart(df, x_col, y_col, title, color_col=None, **kwargs):
+    downsample_width = kwargs.pop('downsample_width', None)
+    if downsample_width:
+        df = downsample_frame(df, x_col, y_col, color_col, width_px=downsample_width)
+    
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {y_col: y_col.replace('_', ' ').title(), x_col: x_col.replace('_', ' ').title()},
         'hover_data': None
     }
     
     kwargs = {**default_kwargs, **kwargs}
     
+    if fast_figures.use_fast_backend(kwargs, fast_figures.SERIES_KWARGS):
+        return fast_figures.line_chart(df, x_col, y_col, title, color_col, **kwargs)
+    
     if color_col:
         fig = px.line(df, x=x_col, y=y_col, color=color_col, title=title, **kwargs)
     else:
@@ -26,10 +103,11 @@ def create_line_chart(df, x_col, y_col, title, color_col=None, **kwargs):
     
     return fig
 
+@memoize_figure('multi_line')
 def create_multi_line_chart(df, x_col, y_cols, title, **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {col: col.replace('_', ' ').title() for col in y_cols},
         'hover_data': None
     }
@@ -60,16 +138,24 @@ def create_multi_line_chart(df, x_col, y_cols, title, **kwargs):
     
     return fig
 
+@memoize_figure('area')
 def create_area_chart(df, x_col, y_col, title, color_col=None, **kwargs):
+    downsample_width = kwargs.pop('downsample_width', None)
+    if downsample_width:
+        df = downsample_frame(df, x_col, y_col, color_col, width_px=downsample_width)
+    
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {y_col: y_col.replace('_', ' ').title(), x_col: x_col.replace('_', ' ').title()},
         'hover_data': None
     }
     
     kwargs = {**default_kwargs, **kwargs}
     
+    if fast_figures.use_fast_backend(kwargs, fast_figures.SERIES_KWARGS):
+        return fast_figures.area_chart(df, x_col, y_col, title, color_col, **kwargs)
+    
     if color_col:
         fig = px.area(df, x=x_col, y=y_col, color=color_col, title=title, **kwargs)
     else:
@@ -82,24 +168,28 @@ def create_area_chart(df, x_col, y_col, title, color_col=None, **kwargs):
     
     return fig
 
+@memoize_figure('stacked_area')
 def create_stacked_area_chart(df, x_col, y_cols, title, **kwargs):
-    melted_df = pd.melt(
-        df, 
-        id_vars=[x_col], 
-        value_vars=y_cols,
-        var_name='Category', 
-        value_name='Value'
-    )
-    
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {'Value': 'Value', 'Category': 'Category'},
         'color_discrete_map': config.EMISSION_SOURCES_COLORS if set(y_cols).issubset(config.EMISSION_SOURCES_COLORS.keys()) else None
     }
     
     kwargs = {**default_kwargs, **kwargs}
     
+    if fast_figures.use_fast_backend(kwargs, fast_figures.SERIES_KWARGS):
+        return fast_figures.stacked_area_chart(df, x_col, y_cols, title, **kwargs)
+    
+    melted_df = pd.melt(
+        df, 
+        id_vars=[x_col], 
+        value_vars=y_cols,
+        var_name='Category', 
+        value_name='Value'
+    )
+    
     fig = px.area(
         melted_df, 
         x=x_col, 
@@ -116,10 +206,11 @@ def create_stacked_area_chart(df, x_col, y_cols, title, **kwargs):
     
     return fig
 
+@memoize_figure('bar_with_average')
 def create_bar_chart_with_average_line(df, x_col, y_col, title, avg_label="Average", **kwargs):
     default_kwargs = {
         'height': config.DEFAULT_CHART_HEIGHT,
-        'template': 'plotly_white',
+        'template': theme.CHART_TEMPLATE,
         'labels': {y_col: y_col.replace('_', ' ').title(), x_col: x_col.replace('_', ' ').title()},
         'hover_data': None
     }